@@ -0,0 +1,134 @@
+"""
+Microbenchmarks for the MemoryService and prompt-assembly hot paths.
+
+Each case runs against synthetic memory at several sizes (users x turns per
+user) and reports min/median time per call, pytest-benchmark style. Save a
+baseline, then compare later runs against it to accept or reject changes:
+
+    python -m benchmarks.bench_hotpaths --sizes 100x5 1000x15 10000x15 --save hotpaths.json
+    python -m benchmarks.bench_hotpaths --sizes 100x5 1000x15 10000x15 --compare hotpaths.json --threshold 0.10
+"""
+import argparse
+import json
+import logging
+import random
+import statistics
+import timeit
+from typing import Callable, Dict, Tuple
+
+from benchmarks.common import environment, exit_on_regressions, find_regressions, write_results
+from services.groq_service import GroqService
+from services.memory_service import MemoryService
+from utils.helpers import clean_text, is_important_conversation
+
+MESSAGES = [
+    "hi",
+    "Can you help me make a 7-day study plan for my math exam next week?",
+    "I feel stressed about my job interview tomorrow, what should I do to prepare?",
+    "Give me a 30-day fitness plan  with\nsimple daily goals.",
+]
+RESPONSES = [
+    "Hello! How can I help you today?",
+    "Of course! Day 1: review algebra basics. Day 2: practice 10 equations. " * 3,
+    "It's completely normal to feel nervous. Micro-goal: research the company for 20 minutes tonight.\n" * 2,
+]
+
+def parse_size(size: str) -> Tuple[int, int]:
+    users, turns = size.lower().split("x")
+    return int(users), int(turns)
+
+def populate(users: int, turns: int, seed: int = 7) -> MemoryService:
+    """Build memory through add_conversation so recent/archived splits look like production"""
+    rng = random.Random(seed)
+    memory_service = MemoryService()
+    for user in range(users):
+        for turn in range(turns):
+            voice = rng.random() < 0.3
+            message = rng.choice(MESSAGES)
+            memory_service.add_conversation(
+                user_id=f"user-{user}",
+                age=rng.choice(["9", "15", "27"]),
+                user_message=message,
+                ai_response=rng.choice(RESPONSES),
+                message_type="voice" if voice else "text",
+                transcribed_text=message if voice else ""
+            )
+    return memory_service
+
+def cases(memory_service: MemoryService, write_service: MemoryService, users: int) -> Dict[str, Callable]:
+    """
+    Read cases run against memory_service; add_conversation grows its own
+    write_service so the read cases keep measuring the requested size
+    """
+    rng = random.Random(11)
+    user_ids = [f"user-{rng.randrange(users)}" for _ in range(1024)]
+    groq_service = GroqService.__new__(GroqService)  # Prompt assembly only; no client needed
+    context = memory_service.get_memory_context(user_ids[0])
+    counter = iter(range(10 ** 12))
+
+    def next_user() -> str:
+        return user_ids[next(counter) % len(user_ids)]
+
+    return {
+        "get_memory_context": lambda: memory_service.get_memory_context(next_user()),
+        "add_conversation": lambda: write_service.add_conversation(
+            next_user(), "15", MESSAGES[1], RESPONSES[1]
+        ),
+        "get_memory_stats": lambda: memory_service.get_memory_stats(next_user()),
+        "get_conversation_history": lambda: memory_service.get_conversation_history(next_user(), 50),
+        "clean_text": lambda: clean_text(MESSAGES[3] + RESPONSES[2]),
+        "is_important_conversation": lambda: is_important_conversation(MESSAGES[1], RESPONSES[1]),
+        "build_system_prompt": lambda: groq_service.build_system_prompt(context, "15"),
+    }
+
+def measure(func: Callable, rounds: int, min_time: float) -> Dict[str, float]:
+    """Calibrate iterations to ~min_time per round, then time `rounds` rounds"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    per_call = [t / number for t in timer.repeat(repeat=rounds, number=number)]
+    return {
+        "min_us": round(min(per_call) * 1e6, 3),
+        "median_us": round(statistics.median(per_call) * 1e6, 3),
+        "stddev_us": round(statistics.pstdev(per_call) * 1e6, 3),
+        "ops_per_s": round(1 / statistics.median(per_call)),
+        "rounds": rounds,
+        "iterations": number,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["100x5", "1000x15", "10000x15"], help="USERSxTURNS")
+    parser.add_argument("--only", nargs="+", help="Run only these cases")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per round")
+    parser.add_argument("--save", help="Write results to this file (use as a baseline)")
+    parser.add_argument("--compare", help="Baseline file; exit 1 if any median regresses")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # MemoryService logs every write
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results: Dict[str, Dict] = {}
+    for size in args.sizes:
+        users, turns = parse_size(size)
+        memory_service = populate(users, turns)
+        write_service = populate(users, turns)
+        for name, func in cases(memory_service, write_service, users).items():
+            if args.only and name not in args.only:
+                continue
+            results[f"{name}[{size}]"] = measure(func, args.rounds, args.min_time)
+
+    write_results({"benchmark": "hotpaths", "environment": environment(), "results": results}, args.save)
+
+    if baseline is not None:
+        def medians(data: Dict) -> Dict[str, float]:
+            return {name: row["median_us"] for name, row in data["results"].items()}
+        exit_on_regressions(find_regressions(medians({"results": results}), medians(baseline), args.threshold))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark large-memory response encoding: the previous hand-built dict +
+response_model path against the shared serialization layer.
+
+Run from the project root:
+    python -m benchmarks.bench_serialization --sizes 100 1000 10000
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from models.chat_models import MemoryResponse
+from models.memory_models import ConversationEntry, UserMemory
+from utils import serialization
+from utils.serialization import conversation_to_dict
+
+def build_memory(size: int) -> UserMemory:
+    """Synthetic user memory with `size` archived conversations and 5 recent ones"""
+    start = datetime(2025, 1, 1)
+    entries = [
+        ConversationEntry(
+            timestamp=start + timedelta(minutes=i),
+            user_message=f"Can you help me plan my study week? Message number {i}.",
+            age="15",
+            ai_response="Of course! Here is a 7-day plan with small daily micro-goals. " * 4,
+            message_type="voice" if i % 3 == 0 else "text",
+            transcribed_text=f"Can you help me plan my study week? Message number {i}." if i % 3 == 0 else ""
+        )
+        for i in range(size + 5)
+    ]
+    return UserMemory(
+        user_id="bench-user",
+        recent_conversations=entries[-5:],
+        archived_conversations=entries[:-5],
+        conversation_count=len(entries),
+        last_updated=entries[-1].timestamp
+    )
+
+def legacy_path(memory: UserMemory) -> bytes:
+    """Previous route: isoformat per field, MemoryResponse validation, jsonable_encoder, json.dumps"""
+    def to_json(conv):
+        return {
+            "timestamp": conv.timestamp.isoformat(),
+            "user_message": conv.user_message,
+            "age": getattr(conv, 'age', None),
+            "ai_response": conv.ai_response,
+            "message_type": conv.message_type,
+            "transcribed_text": conv.transcribed_text
+        }
+    all_conversations = memory.recent_conversations + memory.archived_conversations
+    model = MemoryResponse(
+        user_id=memory.user_id,
+        recent_conversations=[to_json(conv) for conv in memory.recent_conversations],
+        archived_conversations=[to_json(conv) for conv in memory.archived_conversations],
+        total_conversations=memory.conversation_count,
+        text_messages=sum(1 for conv in all_conversations if conv.message_type == "text"),
+        voice_messages=sum(1 for conv in all_conversations if conv.message_type == "voice"),
+        last_updated=memory.last_updated
+    )
+    # FastAPI re-validates the returned model against response_model before encoding
+    model = MemoryResponse.model_validate(model.model_dump())
+    content = jsonable_encoder(model)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def fast_payload(memory: UserMemory) -> dict:
+    all_conversations = memory.recent_conversations + memory.archived_conversations
+    return {
+        "user_id": memory.user_id,
+        "recent_conversations": [conversation_to_dict(conv) for conv in memory.recent_conversations],
+        "archived_conversations": [conversation_to_dict(conv) for conv in memory.archived_conversations],
+        "total_conversations": memory.conversation_count,
+        "text_messages": sum(1 for conv in all_conversations if conv.message_type == "text"),
+        "voice_messages": sum(1 for conv in all_conversations if conv.message_type == "voice"),
+        "last_updated": memory.last_updated
+    }
+
+def measure(func, number: int, repeat: int) -> float:
+    """Best-of-repeat seconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        memory = build_memory(size)
+        number = max(1, 20000 // (size + 5))
+        paths = {
+            "legacy": lambda: legacy_path(memory),
+            "stdlib": lambda: serialization._stdlib_dumps(fast_payload(memory)),
+        }
+        if serialization.orjson is not None:
+            paths["orjson"] = lambda: serialization._orjson_dumps(fast_payload(memory))
+
+        # Both paths must produce the same document
+        assert json.loads(legacy_path(memory)) == json.loads(serialization.dumps(fast_payload(memory)))
+
+        row = {"conversations": size + 5}
+        for name, func in paths.items():
+            row[f"{name}_ms"] = round(measure(func, number, args.repeat) * 1000, 3)
+        for name in paths:
+            if name != "legacy":
+                row[f"{name}_speedup"] = round(row["legacy_ms"] / row[f"{name}_ms"], 2)
+        results.append(row)
+
+    print(json.dumps({"benchmark": "serialization", "orjson": serialization.orjson is not None, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
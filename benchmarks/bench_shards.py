@@ -0,0 +1,93 @@
+"""
+Multi-process load test for sharded memory: client processes (standing in
+for uvicorn workers) hammer add_conversation/get_memory_context through
+ShardedMemoryService while the shard count varies.
+
+Run from the project root:
+    python -m benchmarks.bench_shards --shards 1 2 4 --clients 8 --ops 5000
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import time
+
+from config import config
+from services.shard_client import ShardedMemoryService
+from services.shard_service import start_shards, stop_shards
+
+def client_worker(shard_count: int, base_port: int, client_index: int, ops: int, users: int, start_event, results):
+    logging.disable(logging.INFO)
+    memory = ShardedMemoryService(shard_count, base_port=base_port)
+    # Connect to every shard before the clock starts
+    for user in range(users):
+        memory.get_memory_stats(f"user-{user}")
+    start_event.wait()
+
+    started = time.perf_counter()
+    for i in range(ops):
+        user_id = f"user-{(client_index * 7919 + i) % users}"
+        if i % 2:
+            memory.get_memory_context(user_id)
+        else:
+            memory.add_conversation(user_id, "16", f"Help me plan my revision ({i})", "Start with 25-minute blocks.")
+    results.put((client_index, time.perf_counter() - started))
+
+def run(shard_count: int, clients: int, ops: int, users: int, base_port: int) -> dict:
+    shards = start_shards(shard_count, base_port=base_port)
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=client_worker, args=(shard_count, base_port, index, ops, users, start_event, results)
+        )
+        for index in range(clients)
+    ]
+    try:
+        for worker in workers:
+            worker.start()
+        time.sleep(1.0)  # Let every client finish connecting
+        started = time.perf_counter()
+        start_event.set()
+        durations = [results.get()[1] for _ in workers]
+        wall = time.perf_counter() - started
+        for worker in workers:
+            worker.join()
+    finally:
+        stop_shards(shards)
+
+    total_ops = clients * ops
+    return {
+        "shards": shard_count,
+        "clients": clients,
+        "ops": total_ops,
+        "wall_s": round(wall, 3),
+        "ops_per_s": round(total_ops / wall),
+        "slowest_client_s": round(max(durations), 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=5000, help="Operations per client")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--base-port", type=int, default=18100)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    if not config.MEMORY_SHARD_AUTHKEY:
+        config.MEMORY_SHARD_AUTHKEY = os.environ["MEMORY_SHARD_AUTHKEY"] = secrets.token_hex(32)
+
+    results = []
+    for shard_count in args.shards:
+        results.append(run(shard_count, args.clients, args.ops, args.users, args.base_port))
+        args.base_port += shard_count  # Avoid TIME_WAIT collisions between runs
+    baseline = results[0]["ops_per_s"] / results[0]["shards"]
+    for row in results:
+        row["scaling_efficiency"] = round(row["ops_per_s"] / (baseline * row["shards"]), 2)
+    print(json.dumps({"benchmark": "memory_shards", "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure memory snapshot export size/time and startup restore time.
+
+Run from the project root:
+    python -m benchmarks.bench_snapshot --turns 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from config import config
+from models.memory_models import ConversationEntry, UserMemory
+from services.memory_service import MemoryService
+from services.snapshot_service import SnapshotService, zstandard
+
+def populate(memory_service: MemoryService, turns: int):
+    """Fill memory_service with `turns` conversations spread over fully-populated users"""
+    per_user = config.MAX_RECENT_MEMORIES + config.MAX_ARCHIVED_MEMORIES
+    start = datetime(2025, 1, 1)
+    for user_index in range(0, turns, per_user):
+        user_id = f"user-{user_index // per_user}"
+        entries = [
+            ConversationEntry.model_construct(
+                timestamp=start + timedelta(seconds=user_index + i),
+                user_message=f"How do I stay focused while studying? ({i})",
+                age="16",
+                ai_response="Try 25-minute focus blocks with short breaks. Micro-goal: two blocks today.",
+                message_type="voice" if i % 4 == 0 else "text",
+                transcribed_text="How do I stay focused while studying?" if i % 4 == 0 else ""
+            )
+            for i in range(min(per_user, turns - user_index))
+        ]
+        memory_service.user_memories[user_id] = UserMemory.model_construct(
+            user_id=user_id,
+            recent_conversations=entries[-config.MAX_RECENT_MEMORIES:],
+            archived_conversations=entries[:-config.MAX_RECENT_MEMORIES],
+            conversation_count=len(entries),
+            last_updated=entries[-1].timestamp
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=config.MEMORY_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    source = MemoryService()
+    populate(source, args.turns)
+    extensions = ["", ".gz"] + ([".zst"] if zstandard is not None else [])
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for extension in extensions:
+            path = os.path.join(tmp_dir, f"memories.ndjson{extension}")
+
+            started = time.perf_counter()
+            users = SnapshotService(source).export_snapshot(path)
+            export_seconds = time.perf_counter() - started
+
+            target = MemoryService()
+            started = time.perf_counter()
+            restored = SnapshotService(target).import_snapshot(path, args.chunk_size)
+            restore_seconds = time.perf_counter() - started
+            assert restored == users
+
+            results.append({
+                "format": f"ndjson{extension}",
+                "users": users,
+                "turns": args.turns,
+                "size_mb": round(os.path.getsize(path) / 1024 / 1024, 2),
+                "export_s": round(export_seconds, 3),
+                "restore_s": round(restore_seconds, 3),
+                "restore_turns_per_s": round(args.turns / restore_seconds)
+            })
+
+    print(json.dumps({"benchmark": "snapshot", "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Cold-start measurements for the API.
+
+Each run uses fresh processes: the time to import the app (and whether that
+already loaded the Groq SDK), the time from launching uvicorn to a healthy
+/health, and the first and second /api/chat latency against the fake Groq
+server. The first-vs-second gap is what lazy client creation costs, and
+--prewarm moves it into startup:
+
+    python -m benchmarks.bench_startup --runs 5 --save startup.json
+    python -m benchmarks.bench_startup --runs 5 --prewarm 4
+    python -m benchmarks.bench_startup --runs 5 --compare startup.json --threshold 0.10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import environment, exit_on_regressions, find_regressions, summarize_ms, write_results
+from benchmarks.load_test import wait_until_up
+
+IMPORT_PROBE = (
+    "import sys, time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started, 'groq' in sys.modules)"
+)
+
+def measure_import() -> Dict:
+    probe = subprocess.run([sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True)
+    seconds, groq_loaded = probe.stdout.split()[-2:]
+    return {"import_s": float(seconds), "groq_imported": groq_loaded == "True"}
+
+def measure_serve(args, fake_url: str) -> Dict[str, float]:
+    env = dict(
+        os.environ,
+        GROQ_BASE_URL=fake_url,
+        GROQ_API_KEY="fake-key-for-load-tests",
+        GROQ_PREWARM_CONNECTIONS=str(args.prewarm)
+    )
+    started = time.perf_counter()
+    app = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.app_port), "--log-level", "warning"
+    ], env=env)
+    try:
+        base_url = f"http://127.0.0.1:{args.app_port}"
+        wait_until_up(f"{base_url}/health")
+        ready = time.perf_counter() - started
+
+        chats: List[float] = []
+        with httpx.Client(base_url=base_url, timeout=60.0) as client:
+            for i in range(2):
+                sent = time.perf_counter()
+                response = client.post("/api/chat", data={"user_id": "startup-user", "age": "16", "message": f"hello {i}"})
+                response.raise_for_status()
+                chats.append(time.perf_counter() - sent)
+        return {"ready_s": ready, "first_chat_s": chats[0], "second_chat_s": chats[1]}
+    finally:
+        app.terminate()
+        app.wait(timeout=10)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--prewarm", type=int, default=0, help="GROQ_PREWARM_CONNECTIONS for the app")
+    parser.add_argument("--import-only", action="store_true", help="Skip starting uvicorn and the fake Groq server")
+    parser.add_argument("--app-port", type=int, default=8801)
+    parser.add_argument("--fake-port", type=int, default=9901)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake Groq time-to-first-token")
+    parser.add_argument("--save", help="Write results to this file (use as a baseline)")
+    parser.add_argument("--compare", help="Baseline file; exit 1 if any cold-start metric regresses")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    results = {
+        "import_ms": summarize_ms([run["import_s"] for run in imports]),
+        "groq_imported_at_import": any(run["groq_imported"] for run in imports),
+    }
+
+    if not args.import_only:
+        fake_url = f"http://127.0.0.1:{args.fake_port}"
+        fake = subprocess.Popen([
+            sys.executable, "-m", "benchmarks.fake_groq", "--port", str(args.fake_port),
+            "--latency-ms", str(args.latency_ms), "--token-delay-ms", "0"
+        ])
+        try:
+            wait_until_up(f"{fake_url}/stats")
+            serves = [measure_serve(args, fake_url) for _ in range(args.runs)]
+        finally:
+            fake.terminate()
+            fake.wait(timeout=10)
+        for metric in ("ready_s", "first_chat_s", "second_chat_s"):
+            results[metric[:-2] + "_ms"] = summarize_ms([run[metric] for run in serves])
+
+    write_results({
+        "benchmark": "startup",
+        "environment": environment(),
+        "settings": {"runs": args.runs, "prewarm": args.prewarm, "fake_latency_ms": args.latency_ms},
+        "results": results
+    }, args.save)
+
+    if baseline is not None:
+        def medians(data: Dict) -> Dict[str, float]:
+            return {name: row["p50"] for name, row in data["results"].items() if isinstance(row, dict)}
+        exit_on_regressions(find_regressions(medians({"results": results}), medians(baseline), args.threshold))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark MemoryService.add_conversation with the write-ahead log under
+different fsync policies, and check crash recovery with a killed writer.
+
+Run from the project root:
+    python -m benchmarks.bench_wal --records 20000
+    python -m benchmarks.bench_wal --crash-check
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from services.memory_service import MemoryService
+from services.snapshot_service import SnapshotService
+from services.wal_service import WalService
+
+# (name, fsync_every, fsync_interval)
+POLICIES = [
+    ("every_record", 1, 0),
+    ("every_10", 10, 0),
+    ("every_100", 100, 0),
+    ("every_10ms", 0, 0.01),
+    ("every_1s", 0, 1.0),
+    ("os_only", 0, 0),
+]
+
+def make_service(directory: str, fsync_every: int, fsync_interval: float):
+    memory_service = MemoryService()
+    wal_service = WalService(
+        memory_service,
+        SnapshotService(memory_service),
+        wal_path=os.path.join(directory, "memory.wal"),
+        snapshot_path=os.path.join(directory, "memory.snapshot.ndjson"),
+        fsync_every=fsync_every,
+        fsync_interval=fsync_interval
+    )
+    return memory_service, wal_service
+
+def add(memory_service: MemoryService, i: int):
+    memory_service.add_conversation(
+        user_id=f"user-{i % 1000}",
+        age="17",
+        user_message=f"Can you give me a 7-day plan to prepare for my exam? ({i})",
+        ai_response="Sure! Day 1: list topics. Day 2-6: one topic per day with practice questions. Day 7: review."
+    )
+
+def bench(records: int):
+    results = []
+    baseline = MemoryService()
+    started = time.perf_counter()
+    for i in range(records):
+        add(baseline, i)
+    in_memory_rate = records / (time.perf_counter() - started)
+    results.append({"policy": "in_memory", "appends_per_s": round(in_memory_rate)})
+
+    for name, fsync_every, fsync_interval in POLICIES:
+        with tempfile.TemporaryDirectory() as directory:
+            memory_service, wal_service = make_service(directory, fsync_every, fsync_interval)
+            wal_service.recover()
+            started = time.perf_counter()
+            for i in range(records):
+                add(memory_service, i)
+            rate = records / (time.perf_counter() - started)
+            wal_service.wal.close()
+        results.append({
+            "policy": name,
+            "fsync_every": fsync_every,
+            "fsync_interval": fsync_interval,
+            "appends_per_s": round(rate),
+            "vs_in_memory": round(rate / in_memory_rate, 3)
+        })
+    return results
+
+def crash_child(directory: str):
+    """Append forever with fsync on every record, acknowledging each durable write on stdout"""
+    memory_service, wal_service = make_service(directory, 1, 0)
+    wal_service.recover()
+    i = 0
+    while True:
+        add(memory_service, i)
+        i += 1
+        print(f"ack {i}", flush=True)
+
+def crash_check(acks: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        child = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_wal", "--crash-child", directory],
+            stdout=subprocess.PIPE, text=True
+        )
+        acknowledged = 0
+        for line in child.stdout:
+            acknowledged = int(line.split()[1])
+            if acknowledged >= acks:
+                break
+        os.kill(child.pid, signal.SIGKILL)
+        child.wait()
+
+        memory_service, wal_service = make_service(directory, 1, 0)
+        started = time.perf_counter()
+        wal_service.recover()
+        recovery_seconds = time.perf_counter() - started
+        recovered = sum(memory.conversation_count for memory in memory_service.user_memories.values())
+
+    return {
+        "acknowledged": acknowledged,
+        "recovered": recovered,
+        "recovery_s": round(recovery_seconds, 3),
+        "ok": recovered >= acknowledged
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--crash-check", action="store_true", help="Kill a writer with SIGKILL and verify recovery")
+    parser.add_argument("--acks", type=int, default=5000, help="Acknowledged writes before the kill")
+    parser.add_argument("--crash-child", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.crash_child:
+        crash_child(args.crash_child)
+    elif args.crash_check:
+        result = crash_check(args.acks)
+        print(json.dumps({"benchmark": "wal_crash_recovery", **result}, indent=2))
+        sys.exit(0 if result["ok"] else 1)
+    else:
+        print(json.dumps({"benchmark": "wal_appends", "records": args.records, "results": bench(args.records)}, indent=2))
+
+if __name__ == "__main__":
+    main()
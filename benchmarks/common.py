@@ -0,0 +1,72 @@
+"""Shared helpers for the benchmark scripts: percentiles, result files and regression checks."""
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+def percentile(sorted_samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, math.ceil(pct * len(sorted_samples) / 100) - 1))
+    return sorted_samples[rank]
+
+def summarize_ms(samples_s: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds from samples in seconds"""
+    ordered = sorted(samples_s)
+    if not ordered:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    return {
+        "p50": round(percentile(ordered, 50) * 1000, 3),
+        "p95": round(percentile(ordered, 95) * 1000, 3),
+        "p99": round(percentile(ordered, 99) * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+def environment() -> Dict[str, str]:
+    """Metadata stored with every result file so runs can be compared between versions"""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = "unknown"
+    return {
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+def write_results(results: Dict, output: str = None):
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as result_file:
+            result_file.write(text + "\n")
+    print(text)
+
+def find_regressions(current: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """
+    Compare lower-is-better metrics; a metric regresses when it is more than
+    `threshold` (e.g. 0.10 = 10%) worse than the baseline
+    """
+    regressions = []
+    for name, value in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        change = (value - base) / base
+        if change > threshold:
+            regressions.append(f"{name}: {base:g} -> {value:g} (+{change:.1%})")
+    return regressions
+
+def exit_on_regressions(regressions: List[str]):
+    if regressions:
+        print("Performance regressions detected:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
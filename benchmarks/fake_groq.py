@@ -0,0 +1,179 @@
+"""
+Local stand-in for the Groq API, for load tests without network or quota.
+
+Serves chat completions (streaming and non-streaming) and audio
+transcriptions with configurable latency and error injection. Point the app
+at it with GROQ_BASE_URL:
+
+    python -m benchmarks.fake_groq --port 9000 --latency lognormal --latency-ms 400
+    GROQ_BASE_URL=http://127.0.0.1:9000 GROQ_API_KEY=fake python run.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+FAKE_REPLY = (
+    "That sounds like a great goal! Let's break it into small steps. "
+    "Micro-goal for today: spend 15 focused minutes on it, then note one thing you learned."
+)
+FAKE_TRANSCRIPT = "Can you help me make a study plan for this week?"
+
+class LatencyModel:
+    """Samples delays in seconds: constant, uniform(mean ± jitter) or lognormal with the given mean"""
+    def __init__(self, kind: str, mean_ms: float, jitter_ms: float, seed: int = None):
+        self.kind = kind
+        self.mean = mean_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.mean <= 0:
+            return 0.0
+        if self.kind == "uniform":
+            return max(0.0, self.random.uniform(self.mean - self.jitter, self.mean + self.jitter))
+        if self.kind == "lognormal":
+            # sigma from jitter/mean, mu chosen so the distribution mean equals self.mean
+            sigma = max(0.01, self.jitter / self.mean) if self.jitter else 0.5
+            mu = math.log(self.mean) - sigma ** 2 / 2
+            return self.random.lognormvariate(mu, sigma)
+        return self.mean
+
+def create_app(
+    chat_latency: LatencyModel,
+    transcription_latency: LatencyModel,
+    token_delay_ms: float = 10.0,
+    error_rate: float = 0.0,
+    error_status: int = 500,
+    seed: int = None
+) -> FastAPI:
+    app = FastAPI(title="Fake Groq API")
+    errors = random.Random(seed)
+    stats = {"chat": 0, "chat_stream": 0, "transcriptions": 0, "errors": 0}
+
+    def injected_error():
+        if error_rate and errors.random() < error_rate:
+            stats["errors"] += 1
+            kind = "rate_limit_exceeded" if error_status == 429 else "internal_server_error"
+            return JSONResponse(
+                status_code=error_status,
+                content={"error": {"message": f"Injected {kind}", "type": kind, "code": kind}}
+            )
+        return None
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(chat_latency.sample())
+        error = injected_error()
+        if error is not None:
+            return error
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "fake-model")
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        words = FAKE_REPLY.split(" ")
+
+        if body.get("stream"):
+            stats["chat_stream"] += 1
+
+            async def events():
+                for i, word in enumerate(words):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                    await asyncio.sleep(token_delay_ms / 1000)
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        stats["chat"] += 1
+        await asyncio.sleep(token_delay_ms / 1000 * len(words))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": FAKE_REPLY},
+                "finish_reason": "stop",
+                "logprobs": None
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(words),
+                "total_tokens": prompt_tokens + len(words)
+            }
+        }
+
+    @app.post("/openai/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        form = await request.form()
+        audio = form.get("file")
+        if audio is not None:
+            await audio.read()
+        await asyncio.sleep(transcription_latency.sample())
+        error = injected_error()
+        if error is not None:
+            return error
+
+        stats["transcriptions"] += 1
+        if form.get("response_format", "json") == "text":
+            return PlainTextResponse(FAKE_TRANSCRIPT)
+        return {"text": FAKE_TRANSCRIPT}
+
+    @app.get("/stats")
+    async def get_stats():
+        """Request counters, for checking what a load test actually exercised"""
+        return stats
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", choices=["constant", "uniform", "lognormal"], default="constant")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Mean chat time-to-first-token")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--transcription-latency-ms", type=float, default=500.0)
+    parser.add_argument("--token-delay-ms", type=float, default=10.0, help="Delay per generated word")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing, 0..1")
+    parser.add_argument("--error-status", type=int, choices=[429, 500, 503], default=500)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(
+        LatencyModel(args.latency, args.latency_ms, args.jitter_ms, args.seed),
+        LatencyModel(args.latency, args.transcription_latency_ms, args.jitter_ms, args.seed),
+        token_delay_ms=args.token_delay_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
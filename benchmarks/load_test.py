@@ -0,0 +1,272 @@
+"""
+HTTP load test for the chat, voice-chat and memory endpoints.
+
+Reports count, errors, RPS and p50/p95/p99 latency per scenario as JSON.
+With --spawn it starts the fake Groq server and the app itself, so a run
+needs nothing but this repository:
+
+    python -m benchmarks.load_test --spawn --concurrency 32 --requests 500 --output results.json
+    python -m benchmarks.load_test --spawn --compare results.json --threshold 0.10
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import wave
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import environment, exit_on_regressions, find_regressions, summarize_ms, write_results
+
+SCENARIOS = ("chat", "voice", "memory")
+
+# The chat endpoints answer 200 even when Groq fails; these mark an error reply in the body
+ERROR_REPLY_MARKERS = ("⚠️", "I'm sorry, something went wrong", "I couldn't understand the audio")
+ERROR_REPLY_PREFIX = " "  # GroqService error messages start with a space
+
+# Error rates compare absolutely: a baseline of 0 still allows this much before regressing
+ERROR_RATE_SLACK = 0.005
+
+def sample_wav(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    """Silent mono WAV; the fake Groq server doesn't look at the audio"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+def reply_failed(text: str, expected_reply: Optional[str]) -> bool:
+    """Classify a chat reply; exact when the reply is known (fake Groq), heuristic otherwise"""
+    if expected_reply is not None:
+        return text != expected_reply
+    return not text or text.startswith(ERROR_REPLY_PREFIX) or any(marker in text for marker in ERROR_REPLY_MARKERS)
+
+def request_failed(name: str, response: httpx.Response, expected_reply: Optional[str]) -> bool:
+    if response.status_code >= 400:
+        return True
+    if name == "chat":
+        return reply_failed(response.json().get("response", ""), expected_reply)
+    if name == "voice":
+        body = response.json()
+        return not body.get("transcription_success") or reply_failed(body.get("ai_response", ""), expected_reply)
+    return False
+
+def make_requests(users: int) -> Dict[str, Callable]:
+    audio = sample_wav()
+
+    async def chat(client: httpx.AsyncClient, i: int):
+        return await client.post("/api/chat", data={
+            "user_id": f"load-user-{i % users}",
+            "age": "16",
+            "message": f"Can you help me plan my study week? ({i})"
+        })
+
+    async def voice(client: httpx.AsyncClient, i: int):
+        return await client.post(
+            "/api/voice-chat",
+            data={"user_id": f"load-user-{i % users}", "age": "16"},
+            files={"audio_file": ("recording.wav", audio, "audio/wav")}
+        )
+
+    async def memory(client: httpx.AsyncClient, i: int):
+        user_id = f"load-user-{i % users}"
+        path = (f"/api/memory/{user_id}", f"/api/conversations/{user_id}", f"/api/stats/{user_id}")[i % 3]
+        return await client.get(path)
+
+    return {"chat": chat, "voice": voice, "memory": memory}
+
+async def run_scenario(
+    base_url: str,
+    name: str,
+    request: Callable,
+    total: int,
+    concurrency: int,
+    timeout: float,
+    expected_reply: Optional[str] = None
+) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await request(client, i)
+                failed = request_failed(name, response, expected_reply)
+            except (httpx.HTTPError, ValueError):
+                failed = True
+            elapsed = time.perf_counter() - started
+            if failed:
+                errors += 1
+            else:
+                # Only successful requests count towards latency, so failing fast never looks faster
+                latencies.append(elapsed)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rps": round(total / wall, 2) if wall else 0.0,
+        "latency_ms": summarize_ms(latencies)
+    }
+
+async def fetch_stats(fake_url: Optional[str]) -> Optional[Dict]:
+    if fake_url is None:
+        return None
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"{fake_url}/stats")).json()
+
+def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+@contextmanager
+def spawned_servers(args):
+    """Start the fake Groq server and the app (uvicorn) as subprocesses"""
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    fake = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_groq",
+        "--port", str(args.fake_port),
+        "--latency", args.latency,
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--transcription-latency-ms", str(args.transcription_latency_ms),
+        "--error-rate", str(args.error_rate),
+        "--seed", "1"
+    ])
+    env = dict(os.environ, GROQ_BASE_URL=fake_url, GROQ_API_KEY="fake-key-for-load-tests")
+    app = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--port", str(args.app_port), "--log-level", "warning", "--workers", str(args.workers)
+    ], env=env)
+    try:
+        wait_until_up(f"{fake_url}/stats")
+        wait_until_up(f"http://127.0.0.1:{args.app_port}/health")
+        yield f"http://127.0.0.1:{args.app_port}", fake_url
+    finally:
+        for process in (app, fake):
+            process.terminate()
+            process.wait(timeout=10)
+
+def flatten(results: Dict) -> Dict[str, float]:
+    """Lower-is-better metrics keyed by scenario, for regression comparison"""
+    metrics = {}
+    for name, result in results["scenarios"].items():
+        for pct in ("p50", "p95", "p99"):
+            metrics[f"{name}.{pct}_ms"] = result["latency_ms"][pct]
+        metrics[f"{name}.seconds_per_request"] = 1 / result["rps"] if result["rps"] else 0.0
+    return metrics
+
+def error_rate_regressions(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Error rates compared with an absolute allowance, since a zero baseline is the common case"""
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name, {}).get("error_rate", 0.0)
+        allowed = base * (1 + threshold) + ERROR_RATE_SLACK
+        if result["error_rate"] > allowed:
+            regressions.append(f"{name}.error_rate: {base:g} -> {result['error_rate']:g}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    parser.add_argument("--compare", help="Baseline results file; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown vs baseline (0.10 = 10%%)")
+
+    spawn = parser.add_argument_group("spawned servers")
+    spawn.add_argument("--spawn", action="store_true", help="Start fake Groq and the app locally")
+    spawn.add_argument("--app-port", type=int, default=8800)
+    spawn.add_argument("--fake-port", type=int, default=9900)
+    spawn.add_argument("--workers", type=int, default=1)
+    spawn.add_argument("--latency", choices=["constant", "uniform", "lognormal"], default="constant")
+    spawn.add_argument("--latency-ms", type=float, default=300.0)
+    spawn.add_argument("--jitter-ms", type=float, default=0.0)
+    spawn.add_argument("--transcription-latency-ms", type=float, default=500.0)
+    spawn.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    async def run_all(base_url: str, fake_url: Optional[str] = None) -> Dict:
+        requests = make_requests(args.users)
+        expected_reply = None
+        if fake_url:
+            from benchmarks.fake_groq import FAKE_REPLY  # Imports FastAPI; only needed with --spawn
+            expected_reply = FAKE_REPLY
+        scenarios = {}
+        for name in args.scenarios:
+            before = await fetch_stats(fake_url)
+            scenarios[name] = await run_scenario(
+                base_url, name, requests[name], args.requests, args.concurrency, args.timeout, expected_reply
+            )
+            after = await fetch_stats(fake_url)
+            if after is not None:
+                # Cross-check: errors the fake server injected while this scenario ran
+                scenarios[name]["upstream_errors"] = after["errors"] - before["errors"]
+        return scenarios
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    if args.spawn:
+        with spawned_servers(args) as (base_url, fake_url):
+            scenarios = asyncio.run(run_all(base_url, fake_url))
+    else:
+        scenarios = asyncio.run(run_all(args.base_url))
+
+    results = {
+        "benchmark": "load_test",
+        "environment": environment(),
+        "settings": {
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "users": args.users,
+            "spawned": args.spawn,
+            "fake_groq": {
+                "latency": args.latency,
+                "latency_ms": args.latency_ms,
+                "jitter_ms": args.jitter_ms,
+                "transcription_latency_ms": args.transcription_latency_ms,
+                "error_rate": args.error_rate,
+            } if args.spawn else None,
+        },
+        "scenarios": scenarios
+    }
+    write_results(results, args.output)
+
+    if baseline is not None:
+        exit_on_regressions(
+            find_regressions(flatten(results), flatten(baseline), args.threshold)
+            + error_rate_regressions(results, baseline, args.threshold)
+        )
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,34 @@ load_dotenv()
 class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY", "your-groq-api-key-here")
     GROQ_MODEL = "llama3-8b-8192"  # Free model on Groq
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None  # Override to point at a local stand-in (benchmarks/fake_groq.py)
+    GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "100"))  # Pool size of the shared Groq client
+    GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "20"))  # Idle connections kept open
+    GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))  # Seconds an idle connection is kept
+    GROQ_PREWARM_CONNECTIONS = int(os.getenv("GROQ_PREWARM_CONNECTIONS", "0"))  # Open N connections at startup; 0 = lazy
     MAX_RECENT_MEMORIES = 5  # Maximum recent summaries to keep active
     MAX_ARCHIVED_MEMORIES = 10  # Maximum archived summaries to keep
     MEMORY_SUMMARY_THRESHOLD = 3  # Summarize after every 3 conversations
+    MEMORY_SNAPSHOT_PATH = os.getenv("MEMORY_SNAPSHOT_PATH", "")  # .ndjson, .ndjson.gz or .ndjson.zst
+    MEMORY_RESTORE_ON_STARTUP = os.getenv("MEMORY_RESTORE_ON_STARTUP", "false").lower() == "true"
+    MEMORY_SNAPSHOT_ON_SHUTDOWN = os.getenv("MEMORY_SNAPSHOT_ON_SHUTDOWN", "false").lower() == "true"
+    MEMORY_IMPORT_CHUNK_SIZE = int(os.getenv("MEMORY_IMPORT_CHUNK_SIZE", "1000"))  # Users parsed per import chunk
+    MEMORY_ADMIN_ENDPOINTS = os.getenv("MEMORY_ADMIN_ENDPOINTS", "false").lower() == "true"  # Expose HTTP export/import
+    MEMORY_ADMIN_TOKEN = os.getenv("MEMORY_ADMIN_TOKEN", "")  # Required in X-Admin-Token for export/import
+    MEMORY_WAL_PATH = os.getenv("MEMORY_WAL_PATH", "")  # Write-ahead log; empty disables durability
+    MEMORY_WAL_FSYNC_EVERY = int(os.getenv("MEMORY_WAL_FSYNC_EVERY", "100"))  # fsync after N records (1 = every write, 0 = off)
+    MEMORY_WAL_FSYNC_INTERVAL = float(os.getenv("MEMORY_WAL_FSYNC_INTERVAL", "1.0"))  # fsync after N seconds (0 = off)
+    MEMORY_WAL_COMPACT_RECORDS = int(os.getenv("MEMORY_WAL_COMPACT_RECORDS", "100000"))  # Compact after N records
+    MEMORY_WAL_COMPACT_INTERVAL = float(os.getenv("MEMORY_WAL_COMPACT_INTERVAL", "300"))  # Compact after N seconds
+    MEMORY_SHARDS = int(os.getenv("MEMORY_SHARDS", "0"))  # Shard processes owning user memory; 0 keeps memory in-process
+    MEMORY_SHARD_HOST = os.getenv("MEMORY_SHARD_HOST", "127.0.0.1")  # Must be loopback unless MEMORY_SHARD_ALLOW_REMOTE
+    MEMORY_SHARD_ALLOW_REMOTE = os.getenv("MEMORY_SHARD_ALLOW_REMOTE", "false").lower() == "true"  # Shards accept pickled calls
+    MEMORY_SHARD_BASE_PORT = int(os.getenv("MEMORY_SHARD_BASE_PORT", "8100"))  # Shard i listens on base port + i
+    MEMORY_SHARD_AUTHKEY = os.getenv("MEMORY_SHARD_AUTHKEY", "")  # Shared secret; run.py generates one when empty
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))  # uvicorn workers when running with memory shards
+    WS_IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", "300"))  # Close chat sockets idle this many seconds
+    WS_MAX_PENDING_FRAMES = int(os.getenv("WS_MAX_PENDING_FRAMES", "8"))  # Frames buffered before reads pause
+    WS_MAX_AUDIO_BYTES = int(os.getenv("WS_MAX_AUDIO_BYTES", str(25 * 1024 * 1024)))  # Per voice turn (Groq limit)
+    WS_SEGMENT_CONCURRENCY = int(os.getenv("WS_SEGMENT_CONCURRENCY", "4"))  # Segmented-audio transcriptions in flight per session
 
 config = Config()
\ No newline at end of file
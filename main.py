@@ -1,9 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from config import config
 import logging
+import os
+import time
 
 # Import route modules
-from routes import chat_routes, memory_routes, health_routes
+from routes import chat_routes, memory_routes, health_routes, ws_routes
+from services.groq_client import close_groq_client, prewarm_groq_client
+from services.snapshot_service import snapshot_service
+from services.wal_service import wal_service
+from starlette.concurrency import run_in_threadpool
+import asyncio
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +37,7 @@ app.add_middleware(
 app.include_router(health_routes.router)
 app.include_router(chat_routes.router)
 app.include_router(memory_routes.router)
+app.include_router(ws_routes.router)
 
 # Startup event
 @app.on_event("startup")
@@ -36,11 +45,63 @@ async def startup_event():
     logger.info("🚀 Willmo Chat API starting up...")
     logger.info("📱 Text & Voice chat endpoints ready")
     logger.info("🧠 JSON memory system active")
+    
+    snapshot_path = config.MEMORY_SNAPSHOT_PATH
+    if config.MEMORY_SHARDS > 0:
+        logger.info(f"🧩 Memory served by {config.MEMORY_SHARDS} shard processes")
+    elif config.MEMORY_WAL_PATH:
+        # Like the snapshot below, only one worker may own the log
+        if not wal_service.claim():
+            logger.error(
+                f"💾 Another worker owns {config.MEMORY_WAL_PATH}; this worker runs with the memory log disabled "
+                "and its memory changes are not persisted. Run a single worker, or use MEMORY_SHARDS for several"
+            )
+        else:
+            started = time.perf_counter()
+            replayed = wal_service.recover()
+            logger.info(f"💾 Recovered memory ({replayed} log records replayed) in {time.perf_counter() - started:.2f}s")
+            app.state.wal_task = asyncio.create_task(wal_service.run_background())
+    elif snapshot_path and (config.MEMORY_RESTORE_ON_STARTUP or config.MEMORY_SNAPSHOT_ON_SHUTDOWN):
+        # In-process memory isn't shared between uvicorn workers; only one of them may own the snapshot
+        app.state.owns_snapshot = snapshot_service.claim_snapshot_path(snapshot_path)
+        if not app.state.owns_snapshot:
+            logger.error(
+                f"💾 Another worker owns {snapshot_path}; this worker will not restore or save snapshots. "
+                "Run a single worker, or use MEMORY_SHARDS for several"
+            )
+        elif config.MEMORY_RESTORE_ON_STARTUP:
+            if os.path.exists(snapshot_path):
+                started = time.perf_counter()
+                restored = snapshot_service.import_snapshot(snapshot_path, config.MEMORY_IMPORT_CHUNK_SIZE)
+                logger.info(f"💾 Restored {restored} user memories in {time.perf_counter() - started:.2f}s")
+            else:
+                logger.info(f"💾 No memory snapshot at {snapshot_path}, starting empty")
+    
+    if config.GROQ_PREWARM_CONNECTIONS > 0:
+        # Otherwise the shared Groq client is created by the first chat or voice request
+        started = time.perf_counter()
+        warmed = await run_in_threadpool(prewarm_groq_client, config.GROQ_PREWARM_CONNECTIONS)
+        logger.info(f"🔌 Groq client ready, {warmed} connections pre-warmed in {time.perf_counter() - started:.2f}s")
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("🛑 Willmo Chat API shutting down...")
+    
+    if config.MEMORY_SHARDS > 0:
+        pass  # Shards persist their own memory when they stop
+    elif config.MEMORY_WAL_PATH:
+        if getattr(app.state, "wal_task", None) is not None:
+            app.state.wal_task.cancel()
+        await wal_service.close()  # No-op if this worker never owned the log
+    elif config.MEMORY_SNAPSHOT_ON_SHUTDOWN and getattr(app.state, "owns_snapshot", False):
+        try:
+            saved = snapshot_service.export_snapshot(config.MEMORY_SNAPSHOT_PATH)
+            logger.info(f"💾 Saved {saved} user memories to {config.MEMORY_SNAPSHOT_PATH}")
+        except Exception as e:
+            logger.error(f"Failed to save memory snapshot: {str(e)}")
+    
+    close_groq_client()
 
 # Run the application
 if __name__ == "__main__":
@@ -32,4 +32,5 @@ class MemoryResponse(BaseModel):
 class ConversationHistoryResponse(BaseModel):
     user_id: str
     conversations: List[Dict[str, Any]]
-    total_count: int
\ No newline at end of file
+    total_count: int
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from models.chat_models import ChatRequest, ChatResponse, VoiceChatResponse
+from models.chat_models import ChatResponse, VoiceChatResponse
 from services.chat_service import chat_service
 from utils.transcript_audio import transcription_service
 import logging
+import os
 from datetime import datetime
 
 # Setup logging
@@ -57,7 +58,7 @@ async def voice_chat_endpoint(
     - **age**: Age of the user
     - **audio_file**: Audio file (mp3, wav, m4a, etc.) containing user's voice message
     
-    Process: Audio → Speech-to-Text → AI Response → JSON Memory Storage
+    Process: Audio → Speech-to-Text (memory context built in parallel) → AI Response → JSON Memory Storage
     """
     try:
         logger.info(f"Voice chat request from user: {user_id}")
@@ -68,28 +69,34 @@ async def voice_chat_endpoint(
         if not audio_file:
             raise HTTPException(status_code=400, detail="audio_file is required")
         
-        # Read audio file content
-        audio_content = await audio_file.read()
+        # Validate by size and name; the upload is already spooled, so it is never read fully into memory
+        audio_size = audio_file.size
+        if audio_size is None:
+            audio_file.file.seek(0, os.SEEK_END)
+            audio_size = audio_file.file.tell()
+        audio_file.file.seek(0)
         
-        # Validate audio file
-        is_valid, validation_message = transcription_service.validate_audio_file(
-            audio_content, audio_file.filename
+        is_valid, validation_message = transcription_service.validate_audio_size(
+            audio_size, audio_file.filename
         )
         
         if not is_valid:
             raise HTTPException(status_code=400, detail=validation_message)
         
-        logger.info(f"Processing audio file: {audio_file.filename} ({len(audio_content)} bytes)")
+        logger.info(f"Processing audio file: {audio_file.filename} ({audio_size} bytes)")
         
-        # Transcribe audio to text
-        transcribed_text = transcription_service.transcribe_audio(
-            audio_content, audio_file.filename
+        # Transcribe while the memory context is built, then generate as soon as the text is final
+        transcription_success, transcribed_text, chat_response = await chat_service.process_voice(
+            user_id=user_id,
+            age=age,
+            audio=audio_file.file,
+            filename=audio_file.filename
         )
         
-        if not transcribed_text or transcribed_text.startswith(("⚠️", "❌", "🔑", "⏳", "📁")):
+        if not transcription_success:
             # Transcription failed
             return VoiceChatResponse(
-                transcribed_text=transcribed_text or "Transcription failed",
+                transcribed_text=transcribed_text,
                 ai_response="I couldn't understand the audio. Please try again with a clearer recording.",
                 user_id=user_id,
                 timestamp=datetime.now(),
@@ -97,20 +104,6 @@ async def voice_chat_endpoint(
                 transcription_success=False
             )
         
-        logger.info(f"Successfully transcribed: {transcribed_text[:100]}...")
-        
-        # Create chat request with transcribed text
-        chat_request = ChatRequest(user_id=user_id, message=transcribed_text, age=age)
-        
-        # Process chat with AI (voice type with transcription)
-        chat_response = await chat_service.process_chat(
-            user_id=user_id,
-            age=age,
-            message=transcribed_text,
-            message_type="voice", 
-            transcribed_text=transcribed_text
-        )
-        
         # Return voice chat response
         return VoiceChatResponse(
             transcribed_text=transcribed_text,
@@ -11,7 +11,7 @@ async def root():
         "message": "Willmo Chat - Voice & Text Chatbot API with JSON Memory",
         "status": "running",
         "version": "2.0.0",
-        "features": ["text_chat", "voice_chat", "json_memory", "conversation_history"]
+        "features": ["text_chat", "voice_chat", "json_memory", "conversation_history", "websocket_chat"]
     }
 
 @router.get("/health")
@@ -1,6 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Response, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from models.chat_models import MemoryResponse, ConversationHistoryResponse
-from services.memory_service import memory_service
+from services.memory_service import memory_service, decode_cursor, run_memory_call
+from services.snapshot_service import snapshot_service, check_compression, compression_for_path
+from services.wal_service import wal_service
+from config import config
+from utils.responses import FastJSONResponse
+from utils.serialization import conversation_to_dict, iter_ndjson
+from datetime import datetime
+from itertools import islice
+from typing import Optional
+import hmac
 import logging
 
 # Setup logging
@@ -9,52 +20,63 @@ logger = logging.getLogger(__name__)
 # Create router for memory-related endpoints
 router = APIRouter(prefix="/api", tags=["Memory"])
 
+# Number of NDJSON lines sent per chunk when streaming conversation history
+NDJSON_BATCH_SIZE = 100
+
+SHARDED_SNAPSHOT_DETAIL = "Export/import is not available with MEMORY_SHARDS; each shard snapshots its own users"
+
+def _require_admin(admin_token: Optional[str]):
+    """
+    Gate the export/import endpoints: hidden unless MEMORY_ADMIN_ENDPOINTS is on and a
+    MEMORY_ADMIN_TOKEN is configured, and then only for requests carrying that token
+    """
+    if not config.MEMORY_ADMIN_ENDPOINTS or not config.MEMORY_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not admin_token or not hmac.compare_digest(admin_token.encode(), config.MEMORY_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    if config.MEMORY_SHARDS > 0:
+        raise HTTPException(status_code=400, detail=SHARDED_SNAPSHOT_DETAIL)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against the current ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
 @router.get("/memory/{user_id}", response_model=MemoryResponse)
-async def get_user_memory(user_id: str):
+async def get_user_memory(
+    user_id: str,
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get user's memory information with JSON conversation data
     
     - **user_id**: User identifier
     
-    Returns user's recent and archived conversations in JSON format
+    Returns user's recent and archived conversations in JSON format.
+    Responds with 304 Not Modified when If-None-Match matches the current ETag.
     """
     try:
-        memory = memory_service.get_user_memory(user_id)
-        stats = memory_service.get_memory_stats(user_id)
+        etag = await run_memory_call(memory_service.get_memory_etag, user_id)
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Convert conversations to JSON format
-        recent_json = [
-            {
-                "timestamp": conv.timestamp.isoformat(),
-                "user_message": conv.user_message,
-                "age": getattr(conv, 'age', None),
-                "ai_response": conv.ai_response,
-                "message_type": conv.message_type,
-                "transcribed_text": conv.transcribed_text
-            }
-            for conv in memory.recent_conversations
-        ]
+        memory = await run_memory_call(memory_service.get_user_memory, user_id)
+        stats = await run_memory_call(memory_service.get_memory_stats, user_id)
         
-        archived_json = [
+        # Encoded straight to bytes; the response_model only documents the shape
+        return FastJSONResponse(
             {
-                "timestamp": conv.timestamp.isoformat(),
-                "user_message": conv.user_message,
-                "age": getattr(conv, 'age', None),
-                "ai_response": conv.ai_response,
-                "message_type": conv.message_type,
-                "transcribed_text": conv.transcribed_text
-            }
-            for conv in memory.archived_conversations
-        ]
-        
-        return MemoryResponse(
-            user_id=user_id,
-            recent_conversations=recent_json,
-            archived_conversations=archived_json,
-            total_conversations=stats["total_conversations"],
-            text_messages=stats["text_messages"],
-            voice_messages=stats["voice_messages"],
-            last_updated=memory.last_updated
+                "user_id": user_id,
+                "recent_conversations": [conversation_to_dict(conv) for conv in memory.recent_conversations],
+                "archived_conversations": [conversation_to_dict(conv) for conv in memory.archived_conversations],
+                "total_conversations": stats["total_conversations"],
+                "text_messages": stats["text_messages"],
+                "voice_messages": stats["voice_messages"],
+                "last_updated": memory.last_updated
+            },
+            headers={"ETag": etag}
         )
         
     except Exception as e:
@@ -62,28 +84,73 @@ async def get_user_memory(user_id: str):
         raise HTTPException(status_code=500, detail="Error retrieving user memory")
 
 @router.get("/conversations/{user_id}", response_model=ConversationHistoryResponse)
-async def get_conversation_history(user_id: str, limit: int = 50):
+async def get_conversation_history(
+    user_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: str = "json",
+    if_none_match: Optional[str] = Header(None)
+):
     """
-    Get complete conversation history for a user
+    Get conversation history for a user, newest first
     
     - **user_id**: User identifier
-    - **limit**: Maximum number of conversations to return (default: 50)
+    - **limit**: Maximum number of conversations to return (default: 50 for json, unlimited for ndjson)
+    - **cursor**: `next_cursor` from a previous page; returns conversations older than it
+    - **format**: `json` for a single page, `ndjson` to stream one conversation per line
     
-    Returns complete conversation history in chronological order
+    Responds with 304 Not Modified when If-None-Match matches the current ETag.
     """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    if limit is not None and limit < 0:
+        raise HTTPException(status_code=400, detail="limit must not be negative")
+    
+    before, ties_seen = None, None
+    if cursor:
+        try:
+            before, ties_seen = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     try:
-        conversations = memory_service.get_conversation_history(user_id, limit)
+        etag = await run_memory_call(memory_service.get_memory_etag, user_id)
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        if format == "ndjson":
+            return StreamingResponse(
+                _stream_conversations(user_id, before, ties_seen, limit),
+                media_type="application/x-ndjson",
+                headers={"ETag": etag}
+            )
+        
+        conversations, next_cursor = await run_memory_call(
+            memory_service.get_conversation_page,
+            user_id, 50 if limit is None else limit, before, ties_seen
+        )
         
-        return ConversationHistoryResponse(
-            user_id=user_id,
-            conversations=conversations,
-            total_count=len(conversations)
+        return FastJSONResponse(
+            {
+                "user_id": user_id,
+                "conversations": conversations,
+                "total_count": len(conversations),
+                "next_cursor": next_cursor
+            },
+            headers={"ETag": etag}
         )
         
     except Exception as e:
         logger.error(f"Error retrieving conversation history for user {user_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving conversation history")
 
+async def _stream_conversations(user_id: str, before: Optional[datetime], ties_seen: Optional[int], limit: Optional[int]):
+    """Yield conversation history as NDJSON chunks on the event loop"""
+    entries = await run_memory_call(memory_service.iter_conversations, user_id, before, ties_seen)
+    conversations = (conversation_to_dict(conv) for conv in entries)
+    for chunk in iter_ndjson(islice(conversations, limit), NDJSON_BATCH_SIZE):
+        yield chunk
+
 @router.delete("/memory/{user_id}")
 async def clear_user_memory(user_id: str):
     """
@@ -94,7 +161,7 @@ async def clear_user_memory(user_id: str):
     Returns success status
     """
     try:
-        success = memory_service.clear_user_memory(user_id)
+        success = await run_memory_call(memory_service.clear_user_memory, user_id)
         
         if success:
             return {"message": f"Memory cleared for user: {user_id}", "success": True}
@@ -115,9 +182,77 @@ async def get_memory_stats(user_id: str):
     Returns detailed memory statistics including message type breakdown
     """
     try:
-        stats = memory_service.get_memory_stats(user_id)
+        stats = await run_memory_call(memory_service.get_memory_stats, user_id)
         return stats
         
     except Exception as e:
         logger.error(f"Error getting stats for user {user_id}: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error retrieving statistics")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error retrieving statistics")
+
+@router.get("/memory-export", include_in_schema=False)
+async def export_memories(
+    compression: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Stream all user memories as an NDJSON snapshot (one user per line)
+    
+    - **compression**: Optional `gzip` or `zstd`
+    
+    Admin only (see _require_admin). The output can be loaded again with `POST /api/memory-import`
+    """
+    _require_admin(x_admin_token)
+    try:
+        check_compression(compression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    extension = {"gzip": ".gz", "zstd": ".zst"}.get(compression, "")
+    return StreamingResponse(
+        _stream_export(snapshot_service.iter_export(compression, memories=snapshot_service.freeze_memories())),
+        media_type="application/x-ndjson" if compression is None else "application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="memories.ndjson{extension}"'}
+    )
+
+async def _stream_export(chunks):
+    """
+    Stream an export taken from freeze_memories(): updates that land between chunks
+    don't leak into it, so the file is a point-in-time snapshot
+    """
+    for chunk in chunks:
+        yield chunk
+
+@router.post("/memory-import", include_in_schema=False)
+async def import_memories(
+    snapshot_file: UploadFile = File(...),
+    compression: Optional[str] = Form(None),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Load user memories from an NDJSON snapshot
+    
+    - **snapshot_file**: File produced by `GET /api/memory-export`
+    - **compression**: `gzip` or `zstd`; detected from the filename when omitted
+    
+    Admin only (see _require_admin). Imported users replace existing memory for the same user_id
+    """
+    _require_admin(x_admin_token)
+    if compression is None:
+        compression = compression_for_path(snapshot_file.filename or "")
+    try:
+        imported = await run_in_threadpool(
+            snapshot_service.import_file,
+            snapshot_file.file,
+            compression,
+            True,
+            config.MEMORY_IMPORT_CHUNK_SIZE
+        )
+        # Imports bypass the write-ahead log, so fold them into a snapshot right away
+        await wal_service.compact()
+        return {"message": f"Imported memory for {imported} users", "imported_users": imported, "success": True}
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid snapshot: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error importing memory snapshot: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error importing memory snapshot")
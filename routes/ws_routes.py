@@ -0,0 +1,191 @@
+from fastapi import APIRouter, WebSocket
+from starlette.websockets import WebSocketDisconnect, WebSocketState
+from services.memory_service import run_memory_call
+from services.session_service import ChatSession
+from config import config
+from typing import List, Optional, Union
+import asyncio
+import json
+import logging
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Create router for persistent chat sessions
+router = APIRouter(tags=["WebSocket"])
+
+# WebSocket close codes
+CLOSE_NORMAL = 1000
+CLOSE_GOING_AWAY = 1001
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_MESSAGE_TOO_BIG = 1009
+
+class SessionClosed(Exception):
+    """Raised by the turn processor to end the session with a close code"""
+    def __init__(self, code: int, reason: str):
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+@router.websocket("/ws/chat/{user_id}")
+async def chat_session(websocket: WebSocket, user_id: str, age: str, audio_format: str = "webm"):
+    """
+    Persistent multi-turn text and voice chat
+
+    - **user_id**: Unique identifier for the user
+    - **age**: Age of the user (query parameter)
+    - **audio_format**: Extension of binary audio frames sent without an audio_start (default: webm)
+
+    Client frames:
+    - text: a plain message, or JSON `{"type": "message", "text": ...}`
+    - binary: one complete audio recording, transcribed and answered as a voice turn
+    - JSON `{"type": "audio_start", "filename": "clip.m4a"}`, binary chunks, then `{"type": "audio_end"}`
+      to send one recording in several frames
+    - With `"segmented": true` in audio_start, each binary frame is an independently decodable clip that
+      is transcribed as soon as it arrives; the reply starts as soon as the last segment is transcribed
+    - JSON `{"type": "ping"}`
+
+    Server frames (JSON): `ready`, `transcript`, `delta` (streamed reply text), `done`, `error`, `pong`.
+    Frames are processed one turn at a time; once WS_MAX_PENDING_FRAMES are queued the server
+    stops reading until it catches up. Idle sessions are closed after WS_IDLE_TIMEOUT seconds.
+    """
+    await websocket.accept()
+    logger.info(f"WebSocket chat session opened for user: {user_id}")
+
+    try:
+        session = await run_memory_call(ChatSession, user_id, age)
+    except Exception as e:
+        logger.error(f"Error opening chat session for user {user_id}: {str(e)}")
+        await websocket.close(code=1011, reason="Could not load user memory")
+        return
+
+    await websocket.send_json({"type": "ready", "user_id": user_id, "age_bucket": session.age_bucket})
+
+    frames: asyncio.Queue = asyncio.Queue(maxsize=config.WS_MAX_PENDING_FRAMES)
+    processor = asyncio.create_task(_process_frames(websocket, session, frames, f"recording.{audio_format}"))
+    close_code, close_reason = CLOSE_NORMAL, ""
+
+    try:
+        while True:
+            receive = asyncio.ensure_future(websocket.receive())
+            done, _ = await asyncio.wait(
+                {receive, processor}, timeout=config.WS_IDLE_TIMEOUT, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receive not in done:
+                receive.cancel()
+                if not done:
+                    close_code, close_reason = CLOSE_GOING_AWAY, "Idle timeout"
+                break  # Timed out, or the processor ended the session
+            message = receive.result()
+            if message["type"] == "websocket.disconnect":
+                break
+            frame = message.get("bytes") if message.get("bytes") is not None else message.get("text")
+            # Waits while the queue is full, which stops reading and pushes back on the client
+            put = asyncio.ensure_future(frames.put(frame))
+            await asyncio.wait({put, processor}, return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                break
+    finally:
+        # Timed out or client gone: drop any queued turns
+        processor.cancel()
+        try:
+            await processor
+        except SessionClosed as closed:
+            close_code, close_reason = closed.code, closed.reason
+        except (asyncio.CancelledError, WebSocketDisconnect):
+            pass
+        except Exception as e:
+            logger.error(f"Error in chat session for user {user_id}: {str(e)}")
+            close_code, close_reason = 1011, "Internal server error"
+
+        if websocket.application_state == WebSocketState.CONNECTED and websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close(code=close_code, reason=close_reason or None)
+        logger.info(f"WebSocket chat session closed for user: {user_id} ({session.turns} turns)")
+
+async def _process_frames(websocket: WebSocket, session: ChatSession, frames: asyncio.Queue, default_filename: str):
+    """Handle queued frames one turn at a time"""
+    audio: Optional[bytearray] = None
+    audio_filename = default_filename
+    segments: Optional[List[asyncio.Task]] = None
+    segment_bytes = 0
+
+    try:
+        while True:
+            frame: Union[bytes, str] = await frames.get()
+            if isinstance(frame, bytes):
+                if segments is not None:
+                    segment_bytes += len(frame)
+                    if segment_bytes > config.WS_MAX_AUDIO_BYTES:
+                        raise SessionClosed(CLOSE_MESSAGE_TOO_BIG, "Audio too large. Maximum size is 25MB.")
+                    segments.append(session.start_segment(frame, audio_filename))
+                    continue
+                if audio is None:
+                    await _voice_turn(websocket, session, frame, default_filename)
+                    continue
+                audio.extend(frame)
+                if len(audio) > config.WS_MAX_AUDIO_BYTES:
+                    raise SessionClosed(CLOSE_MESSAGE_TOO_BIG, "Audio too large. Maximum size is 25MB.")
+                continue
+
+            event = _parse_text_frame(frame)
+            kind = event.get("type")
+            if kind == "message":
+                text = str(event.get("text", "")).strip()
+                if not text:
+                    await websocket.send_json({"type": "error", "detail": "message is required"})
+                    continue
+                await _reply(websocket, session, text, "text")
+            elif kind == "audio_start":
+                # A new recording replaces any unfinished one
+                for segment in segments or ():
+                    segment.cancel()
+                audio, segments = None, None
+                audio_filename = event.get("filename") or default_filename
+                if event.get("segmented"):
+                    segments, segment_bytes = [], 0
+                else:
+                    audio = bytearray()
+            elif kind == "audio_end":
+                if segments is not None:
+                    pending, segments = segments, None
+                    success, transcribed_text = await session.finish_segments(pending)
+                    await _send_transcript(websocket, session, success, transcribed_text)
+                    continue
+                if audio is None:
+                    await websocket.send_json({"type": "error", "detail": "audio_end without audio_start"})
+                    continue
+                content, audio = bytes(audio), None
+                await _voice_turn(websocket, session, content, audio_filename)
+            elif kind == "ping":
+                await websocket.send_json({"type": "pong"})
+            else:
+                raise SessionClosed(CLOSE_POLICY_VIOLATION, f"Unknown frame type: {kind}")
+    finally:
+        # Session ending mid-recording: stop transcribing segments nobody will read
+        for segment in segments or ():
+            segment.cancel()
+
+def _parse_text_frame(text: str) -> dict:
+    """JSON control frames start with '{'; anything else is a plain chat message"""
+    if text.lstrip().startswith("{"):
+        try:
+            event = json.loads(text)
+            if isinstance(event, dict):
+                return event
+        except ValueError:
+            pass
+    return {"type": "message", "text": text}
+
+async def _voice_turn(websocket: WebSocket, session: ChatSession, audio_content: bytes, filename: str):
+    success, transcribed_text = await session.transcribe(audio_content, filename)
+    await _send_transcript(websocket, session, success, transcribed_text)
+
+async def _send_transcript(websocket: WebSocket, session: ChatSession, success: bool, transcribed_text: str):
+    await websocket.send_json({"type": "transcript", "text": transcribed_text, "success": success})
+    if success:
+        await _reply(websocket, session, transcribed_text, "voice", transcribed_text)
+
+async def _reply(websocket: WebSocket, session: ChatSession, message: str, message_type: str, transcribed_text: str = ""):
+    async for kind, payload in session.stream_reply(message, message_type, transcribed_text):
+        await websocket.send_json({"type": kind, **payload})
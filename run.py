@@ -1,6 +1,23 @@
+import os
+import secrets
 import uvicorn
+from config import config
 
-if __name__ == "__main__":
+if __name__ == "__main__" and config.MEMORY_SHARDS > 0:
+    if not config.MEMORY_SHARD_AUTHKEY:
+        # Fresh secret per launch; shards and web workers inherit it through the environment
+        config.MEMORY_SHARD_AUTHKEY = os.environ["MEMORY_SHARD_AUTHKEY"] = secrets.token_hex(32)
+    from services.shard_service import start_shards, stop_shards
+
+    print(f"🧩 Starting {config.MEMORY_SHARDS} memory shards and {config.WEB_WORKERS} web workers...")
+    shards = start_shards(config.MEMORY_SHARDS)
+    try:
+        # Reload is incompatible with multiple workers
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, log_level="info", workers=config.WEB_WORKERS)
+    finally:
+        stop_shards(shards)
+
+elif __name__ == "__main__":
     print("🚀 Starting Text-based Chatbot with Memory...")
     print("📝 Make sure to set your GROQ_API_KEY in .env file")
     print("🌐 API will be available at: http://localhost:8000")
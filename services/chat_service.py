@@ -1,7 +1,11 @@
 from datetime import datetime
-from models.chat_models import ChatRequest, ChatResponse
+from typing import BinaryIO, Optional, Tuple, Union
+from starlette.concurrency import run_in_threadpool
+from models.chat_models import ChatResponse
 from services.groq_service import groq_service
-from services.memory_service import memory_service
+from services.memory_service import memory_service, run_memory_call
+from utils.transcript_audio import transcription_service
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,8 +14,17 @@ class ChatService:
     def __init__(self):
         self.groq_service = groq_service
         self.memory_service = memory_service
+        self.transcription_service = transcription_service
     
-    async def process_chat(self, user_id: str, age: str, message: str, message_type: str = "text", transcribed_text: str = "") -> ChatResponse:
+    async def process_chat(
+        self,
+        user_id: str,
+        age: str,
+        message: str,
+        message_type: str = "text",
+        transcribed_text: str = "",
+        memory_context: Optional[str] = None
+    ) -> ChatResponse:
         """Process a chat request with memory integration"""
         try:
             user_id = user_id
@@ -20,15 +33,22 @@ class ChatService:
             
             logger.info(f"Processing {message_type} chat for user: {user_id}")
             
-            # Step 1: Get user's memory context
-            memory_context = self.memory_service.get_memory_context(user_id)
+            # Step 1: Get user's memory context (unless the caller already fetched it)
+            if memory_context is None:
+                memory_context = await run_memory_call(self.memory_service.get_memory_context, user_id)
             logger.info(f"Retrieved memory context for user: {user_id}")
             
-            # Step 2: Generate AI response with memory context
-            ai_response = self.groq_service.generate_response(user_message,age, memory_context)
+            # Step 2: Generate AI response with memory context (blocking HTTP call, kept off the event loop)
+            ai_response = await run_in_threadpool(
+                self.groq_service.generate_response,
+                user_message=user_message,
+                memory_context=memory_context,
+                age=age
+            )
             
             # Step 3: Add conversation to memory
-            memory_updated = self.memory_service.add_conversation(
+            memory_updated = await run_memory_call(
+                self.memory_service.add_conversation,
                 user_id=user_id,
                 age=age,
                 user_message=user_message,
@@ -59,6 +79,38 @@ class ChatService:
                 timestamp=datetime.now(),
                 memory_updated=False
             )
+    
+    async def process_voice(
+        self,
+        user_id: str,
+        age: str,
+        audio: Union[bytes, BinaryIO],
+        filename: str
+    ) -> Tuple[bool, str, Optional[ChatResponse]]:
+        """
+        Pipelined voice turn: the memory context is built while the audio is being
+        transcribed, and the LLM call starts as soon as the transcript is final.
+        
+        Returns:
+            (transcription_success, transcribed text or error message, chat response or None)
+        """
+        transcription = run_in_threadpool(self.transcription_service.transcribe_audio, audio, filename)
+        context = run_in_threadpool(self.memory_service.get_memory_context, user_id)
+        transcribed_text, memory_context = await asyncio.gather(transcription, context)
+        
+        if self.transcription_service.is_transcription_error(transcribed_text):
+            return False, transcribed_text or "Transcription failed", None
+        
+        logger.info(f"Successfully transcribed: {transcribed_text[:100]}...")
+        chat_response = await self.process_chat(
+            user_id=user_id,
+            age=age,
+            message=transcribed_text,
+            message_type="voice",
+            transcribed_text=transcribed_text,
+            memory_context=memory_context
+        )
+        return True, transcribed_text, chat_response
 
 # Initialize global chat service
 chat_service = ChatService()
\ No newline at end of file
@@ -0,0 +1,83 @@
+from config import config
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+import logging
+import threading
+
+if TYPE_CHECKING:
+    from groq import Groq
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_http_client = None
+_client_lock = threading.Lock()
+
+def get_groq_client() -> Optional["Groq"]:
+    """
+    Return the process-wide Groq client, creating it on first use
+
+    Chat and transcription share one client and therefore one pooled set of
+    keep-alive connections. Returns None if the client can't be created; the
+    next call tries again.
+    """
+    global _client, _http_client
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            try:
+                # Imported here so importing the routes doesn't pay for the SDK
+                import httpx
+                from groq import Groq
+
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=config.GROQ_MAX_CONNECTIONS,
+                        max_keepalive_connections=config.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=config.GROQ_KEEPALIVE_EXPIRY
+                    )
+                )
+                _client = Groq(api_key=config.GROQ_API_KEY, base_url=config.GROQ_BASE_URL, http_client=http_client)
+                _http_client = http_client
+                logger.info("Groq client initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize Groq client: {str(e)}")
+    return _client
+
+def prewarm_groq_client(connections: int) -> int:
+    """
+    Open up to `connections` keep-alive connections so the first requests skip
+    the TCP/TLS handshake. Returns how many warm-up requests got a response.
+    """
+    client = get_groq_client()
+    if client is None or connections <= 0:
+        return 0
+
+    # Appended like the SDK's own request paths, so a path prefix in GROQ_BASE_URL (e.g. a proxy) is kept
+    models_url = f"{str(client.base_url).rstrip('/')}/openai/v1/models"
+
+    def warm(_) -> bool:
+        try:
+            # Any HTTP response leaves the connection in the pool, even an error status
+            _http_client.get(
+                models_url,
+                headers={"Authorization": f"Bearer {client.api_key}"},
+                timeout=10.0
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Groq connection pre-warm failed: {str(e)}")
+            return False
+
+    # Concurrent requests so each one needs its own connection
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        return sum(pool.map(warm, range(connections)))
+
+def close_groq_client():
+    """Close the shared client's connection pool (it is recreated on next use)"""
+    global _client, _http_client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = _http_client = None
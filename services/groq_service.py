@@ -1,34 +1,22 @@
-from groq import Groq
 from config import config
+from services.groq_client import get_groq_client
+from typing import Iterator
 import logging
 
 logger = logging.getLogger(__name__)
 
 class GroqService:
     def __init__(self):
-        try:
-            self.client = Groq(api_key=config.GROQ_API_KEY)
-            self.model = config.GROQ_MODEL
-            logger.info("Groq client initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Groq client: {str(e)}")
-            # Create a dummy client for development
-            self.client = None
-            self.model = config.GROQ_MODEL
+        self.model = config.GROQ_MODEL
     
-    def generate_response(self, user_message: str, memory_context: str, age: str) -> str:
-        """Generate AI response using Groq API with memory context and user age"""
-        
-        # Check if API key is properly set
-        if config.GROQ_API_KEY == "your-groq-api-key-here" or not config.GROQ_API_KEY:
-            return "⚠️ Please set your GROQ_API_KEY in the .env file. Get your free API key from: https://console.groq.com"
-        
-        if not self.client:
-            return " Groq client initialization failed. Please check your API key and internet connection."
-        
-        try:
-            # Create system prompt with memory context and age
-            system_prompt = f"""user age: {age} 
+    @property
+    def client(self):
+        """Shared Groq client, created on first use (None if it couldn't be created)"""
+        return get_groq_client()
+    
+    def build_system_prompt(self, memory_context: str, age: str) -> str:
+        """Build the system prompt with memory context and user age"""
+        return f"""user age: {age} 
 memory context: {memory_context}
 You are an AI-powered assistant that responds based on the user's age and the context of their query. The system must ensure appropriate content filtering, as outlined below.
 
@@ -99,6 +87,20 @@ GLOBAL RULES:
     * Under 18 → Only general healthy habits.
     * 18+ → Detailed personalized plan.
 - If a query doesn’t fit rules → Refuse politely or redirect."""
+    
+    def generate_response(self, user_message: str, memory_context: str, age: str) -> str:
+        """Generate AI response using Groq API with memory context and user age"""
+        
+        # Check if API key is properly set
+        if config.GROQ_API_KEY == "your-groq-api-key-here" or not config.GROQ_API_KEY:
+            return "⚠️ Please set your GROQ_API_KEY in the .env file. Get your free API key from: https://console.groq.com"
+        
+        if not self.client:
+            return " Groq client initialization failed. Please check your API key and internet connection."
+        
+        try:
+            # Create system prompt with memory context and age
+            system_prompt = self.build_system_prompt(memory_context, age)
 
             # Generate response by ai 
             chat_completion = self.client.chat.completions.create(
@@ -120,12 +122,53 @@ GLOBAL RULES:
         
         except Exception as e:
             logger.error(f"Error generating response with Groq: {str(e)}")
-            if "authentication" in str(e).lower() or "api_key" in str(e).lower():
-                return " Authentication failed. Please check your GROQ_API_KEY in the .env file."
-            elif "rate_limit" in str(e).lower():
-                return " Rate limit reached. Please try again in a moment."
-            else:
-                return f" I'm having trouble processing your request: {str(e)}"
+            return self._error_message(e)
+    
+    def stream_response(self, user_message: str, system_prompt: str) -> Iterator[str]:
+        """
+        Generate an AI response as a stream of text deltas
+        
+        Takes a prebuilt system prompt (see build_system_prompt) so long-lived
+        sessions don't rebuild it every turn. Errors are yielded as a single message.
+        """
+        if config.GROQ_API_KEY == "your-groq-api-key-here" or not config.GROQ_API_KEY:
+            yield "⚠️ Please set your GROQ_API_KEY in the .env file. Get your free API key from: https://console.groq.com"
+            return
+        
+        if not self.client:
+            yield " Groq client initialization failed. Please check your API key and internet connection."
+            return
+        
+        try:
+            stream = self.client.chat.completions.create(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_message}
+                ],
+                model=self.model,
+                max_tokens=500,
+                temperature=0.7,
+                top_p=1,
+                stream=True
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+            logger.info(f"Streamed response with Groq API (model: {self.model})")
+        
+        except Exception as e:
+            logger.error(f"Error streaming response with Groq: {str(e)}")
+            yield self._error_message(e)
+    
+    @staticmethod
+    def _error_message(e: Exception) -> str:
+        if "authentication" in str(e).lower() or "api_key" in str(e).lower():
+            return " Authentication failed. Please check your GROQ_API_KEY in the .env file."
+        elif "rate_limit" in str(e).lower():
+            return " Rate limit reached. Please try again in a moment."
+        else:
+            return f" I'm having trouble processing your request: {str(e)}"
 
 # Initialize global Groq service
 groq_service = GroqService()
\ No newline at end of file
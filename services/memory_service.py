@@ -1,8 +1,11 @@
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from itertools import islice
 from models.memory_models import UserMemory, ConversationEntry
 from config import config
 from utils.helpers import is_important_conversation, clean_text
+from utils.serialization import conversation_to_dict
+import asyncio
 import logging
 import json
 
@@ -14,6 +17,8 @@ class MemoryService:
     def __init__(self):
         # In-memory cache for user memories
         self.user_memories: Dict[str, UserMemory] = {}
+        # Optional write-ahead log (see services/wal_service.py); None keeps memory purely in-process
+        self.wal = None
     
     def get_user_memory(self, user_id: str) -> UserMemory:
         """Get or create user memory (age ignored at this level)"""
@@ -62,8 +67,6 @@ class MemoryService:
         transcribed_text: str = ""
     ) -> bool:
         """Add new conversation to user memory. Age is captured per conversation only."""
-        memory = self.get_user_memory(user_id)
-        
         conversation = ConversationEntry(
             timestamp=datetime.now(),
             user_message=clean_text(user_message),
@@ -72,12 +75,20 @@ class MemoryService:
             message_type=message_type,
             transcribed_text=clean_text(transcribed_text) if transcribed_text else ""
         )
+        if self.wal is not None:
+            self.wal.append({"op": "add", "user_id": user_id, "conversation": conversation_to_dict(conversation)})
+        memory = self.apply_conversation(user_id, conversation)
+        logger.info(f"Added {message_type} conversation for user: {user_id} (total: {memory.conversation_count})")
+        return True
+    
+    def apply_conversation(self, user_id: str, conversation: ConversationEntry) -> UserMemory:
+        """Store an already-built conversation entry; also used to replay the write-ahead log"""
+        memory = self.get_user_memory(user_id)
         memory.recent_conversations.append(conversation)
         memory.conversation_count += 1
-        memory.last_updated = datetime.now()
+        memory.last_updated = conversation.timestamp
         self._optimize_memory(memory)
-        logger.info(f"Added {message_type} conversation for user: {user_id} (total: {memory.conversation_count})")
-        return True
+        return memory
     
     def _optimize_memory(self, memory: UserMemory):
         if len(memory.recent_conversations) > config.MAX_RECENT_MEMORIES:
@@ -90,6 +101,8 @@ class MemoryService:
     
     def clear_user_memory(self, user_id: str) -> bool:
         if user_id in self.user_memories:
+            if self.wal is not None:
+                self.wal.append({"op": "clear", "user_id": user_id})
             del self.user_memories[user_id]
             logger.info(f"Cleared memory for user: {user_id}")
             return True
@@ -109,20 +122,121 @@ class MemoryService:
             "last_updated": memory.last_updated.isoformat()
         }
     
-    def get_conversation_history(self, user_id: str, limit: int = 50) -> List[Dict]:
+    def get_memory_etag(self, user_id: str) -> str:
+        """Weak ETag for a user's memory, derived from last_updated and conversation count"""
         memory = self.get_user_memory(user_id)
-        all_conversations = memory.recent_conversations + memory.archived_conversations
-        all_conversations.sort(key=lambda x: x.timestamp, reverse=True)
-        return [
-            {
-                "timestamp": conv.timestamp.isoformat(),
-                "user_message": conv.user_message,
-                "age": getattr(conv, 'age', None),
-                "ai_response": conv.ai_response,
-                "message_type": conv.message_type,
-                "transcribed_text": conv.transcribed_text
-            }
-            for conv in all_conversations[:limit]
-        ]
+        return f'W/"{memory.conversation_count}-{memory.last_updated.timestamp():.6f}"'
+    
+    def iter_conversations(
+        self,
+        user_id: str,
+        before: Optional[datetime] = None,
+        ties_seen: Optional[int] = None
+    ) -> Iterator[ConversationEntry]:
+        """
+        Yield a user's conversations newest first, optionally only those older than `before`
+        
+        With `ties_seen`, conversations at exactly `before` are included too, except the
+        newest `ties_seen` of them (already returned on an earlier page), so entries that
+        share a timestamp are never skipped.
+        
+        Archived conversations are always older than recent ones and both lists are
+        appended in chronological order, so (archived + recent) is already a
+        timestamp-ordered index - no sorting or copying is needed.
+        """
+        memory = self.get_user_memory(user_id)
+        skip = ties_seen or 0
+        for conversations in (memory.recent_conversations, memory.archived_conversations):
+            if before is None:
+                end = len(conversations)
+            else:
+                end = _bisect_before(conversations, before, inclusive=ties_seen is not None)
+            for i in range(end - 1, -1, -1):
+                if skip and conversations[i].timestamp == before:
+                    skip -= 1
+                    continue
+                yield conversations[i]
+    
+    def get_conversation_page(
+        self,
+        user_id: str,
+        limit: int = 50,
+        before: Optional[datetime] = None,
+        ties_seen: Optional[int] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of conversation history (newest first) using keyset pagination
+        
+        Returns the page and the cursor for the next page (see encode_cursor), or None
+        when there are no older conversations.
+        """
+        page = list(islice(self.iter_conversations(user_id, before, ties_seen), limit + 1))
+        next_cursor = None
+        if len(page) > limit and limit > 0:
+            boundary = page[limit - 1].timestamp
+            seen = sum(1 for conv in page[:limit] if conv.timestamp == boundary)
+            if boundary == before and ties_seen:
+                seen += ties_seen
+            next_cursor = encode_cursor(boundary, seen)
+        return [conversation_to_dict(conv, iso_timestamp=True) for conv in page[:limit]], next_cursor
+    
+    def get_conversation_history(
+        self,
+        user_id: str,
+        limit: int = 50,
+        before: Optional[datetime] = None,
+        ties_seen: Optional[int] = None
+    ) -> List[Dict]:
+        conversations, _ = self.get_conversation_page(user_id, limit, before, ties_seen)
+        return conversations
+
+def encode_cursor(timestamp: datetime, ties_seen: int) -> str:
+    """Page cursor: the last returned timestamp plus how many entries at that timestamp were returned"""
+    return f"{timestamp.isoformat()}~{ties_seen}"
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Optional[int]]:
+    """
+    Parse a page cursor into (before, ties_seen); raises ValueError if it is malformed
+    
+    A bare ISO timestamp is accepted too and means "strictly older than".
+    """
+    timestamp, sep, ties_seen = cursor.partition("~")
+    if not sep:
+        return datetime.fromisoformat(timestamp), None
+    count = int(ties_seen)
+    if count < 0:
+        raise ValueError("Invalid cursor")
+    return datetime.fromisoformat(timestamp), count
+
+def _bisect_before(conversations: List[ConversationEntry], before: datetime, inclusive: bool = False) -> int:
+    """
+    Index of the first conversation whose timestamp is >= before, or > before when
+    inclusive (list is chronological)
+    """
+    lo, hi = 0, len(conversations)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        timestamp = conversations[mid].timestamp
+        if timestamp < before or (inclusive and timestamp == before):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+if config.MEMORY_SHARDS > 0:
+    # Memory lives in shard processes shared by all web workers (see services/shard_service.py)
+    from services.shard_client import ShardedMemoryService
+    memory_service = ShardedMemoryService(config.MEMORY_SHARDS)
+else:
+    memory_service = MemoryService()
+
+async def run_memory_call(func: Callable, *args, **kwargs) -> Any:
+    """
+    Call a memory_service method from async code
 
-memory_service = MemoryService()
+    In-process memory is called inline. With MEMORY_SHARDS every call is a blocking
+    socket round trip, so it runs in a worker thread instead of on the event loop.
+    """
+    if config.MEMORY_SHARDS > 0:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return func(*args, **kwargs)
@@ -0,0 +1,121 @@
+from typing import AsyncIterator, Dict, List, Tuple
+from datetime import datetime
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from config import config
+from services.groq_service import groq_service
+from services.memory_service import memory_service, run_memory_call
+from utils.helpers import age_bucket
+from utils.transcript_audio import NO_SPEECH_MESSAGE, transcription_service
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ChatSession:
+    """
+    Per-connection chat state for long-lived (WebSocket) sessions
+
+    The memory context and system prompt are built once when the session opens
+    and only rebuilt when the user's memory ETag has changed, instead of on
+    every request.
+    """
+    def __init__(self, user_id: str, age: str):
+        self.user_id = user_id
+        self.age = age
+        # Only reported in the "ready" frame; the prompt is built from the raw age
+        self.age_bucket = age_bucket(age)
+        self.groq_service = groq_service
+        self.memory_service = memory_service
+        self.transcription_service = transcription_service
+        self.turns = 0
+        # Bounds concurrent Whisper calls when a recording arrives as independent segments
+        self.segment_slots = asyncio.Semaphore(config.WS_SEGMENT_CONCURRENCY)
+        self.refresh_context()
+
+    def refresh_context(self):
+        """Rebuild the cached memory context and system prompt from the user's memory"""
+        # ETag first: a write landing between the two calls just triggers another refresh
+        self.memory_etag = self.memory_service.get_memory_etag(self.user_id)
+        self.memory_context = self.memory_service.get_memory_context(self.user_id)
+        self.system_prompt = self.groq_service.build_system_prompt(self.memory_context, self.age)
+
+    async def transcribe(self, audio_content: bytes, filename: str) -> Tuple[bool, str]:
+        """Validate and transcribe one audio clip; returns (success, transcript or error message)"""
+        is_valid, validation_message = self.transcription_service.validate_audio_file(audio_content, filename)
+        if not is_valid:
+            return False, validation_message
+        transcribed_text = await run_in_threadpool(
+            self.transcription_service.transcribe_audio, audio_content, filename
+        )
+        if self.transcription_service.is_transcription_error(transcribed_text):
+            return False, transcribed_text or "Transcription failed"
+        return True, transcribed_text
+
+    def start_segment(self, audio_content: bytes, filename: str) -> asyncio.Task:
+        """Start transcribing one independently decodable segment while the rest is still uploading"""
+        async def transcribe_segment() -> Tuple[bool, str]:
+            async with self.segment_slots:
+                return await self.transcribe(audio_content, filename)
+        return asyncio.create_task(transcribe_segment())
+
+    async def finish_segments(self, segments: List[asyncio.Task]) -> Tuple[bool, str]:
+        """
+        Join segment transcripts in upload order
+
+        Segments without speech (pauses) are skipped; any other failure fails the
+        whole turn, so a partial transcript is never answered or stored.
+        """
+        if not segments:
+            return False, "Empty file uploaded."
+        results = await asyncio.gather(*segments)
+        texts = []
+        for success, text in results:
+            if success:
+                texts.append(text)
+            elif text != NO_SPEECH_MESSAGE:
+                return False, text
+        if not texts:
+            return False, NO_SPEECH_MESSAGE
+        return True, " ".join(texts)
+
+    async def stream_reply(
+        self,
+        message: str,
+        message_type: str = "text",
+        transcribed_text: str = ""
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Yield ("delta", {"text": ...}) events as the reply streams in, then one
+        ("done", {...}) event once the turn has been stored in memory
+        """
+        # The user's memory may have changed elsewhere (HTTP turns, another socket, a DELETE)
+        if await run_memory_call(self.memory_service.get_memory_etag, self.user_id) != self.memory_etag:
+            await run_memory_call(self.refresh_context)
+
+        parts = []
+        async for delta in iterate_in_threadpool(self.groq_service.stream_response(message, self.system_prompt)):
+            parts.append(delta)
+            yield "delta", {"text": delta}
+
+        ai_response = "".join(parts)
+        memory_updated = False
+        try:
+            memory_updated = await run_memory_call(
+                self.memory_service.add_conversation,
+                user_id=self.user_id,
+                age=self.age,
+                user_message=message,
+                ai_response=ai_response,
+                message_type=message_type,
+                transcribed_text=transcribed_text
+            )
+            await run_memory_call(self.refresh_context)
+        except Exception as e:
+            logger.error(f"Error storing session turn for user {self.user_id}: {str(e)}")
+        self.turns += 1
+
+        yield "done", {
+            "response": ai_response,
+            "memory_updated": memory_updated,
+            "timestamp": datetime.now().isoformat()
+        }
@@ -0,0 +1,175 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+from multiprocessing.connection import Client
+from models.memory_models import UserMemory, ConversationEntry
+from config import config
+import hashlib
+import ipaddress
+import threading
+import time
+
+# MemoryService methods a shard will execute on behalf of clients
+SHARD_METHODS = {
+    "get_user_memory",
+    "get_memory_context",
+    "add_conversation",
+    "clear_user_memory",
+    "get_memory_stats",
+    "get_memory_etag",
+    "iter_conversations",
+    "get_conversation_page",
+    "get_conversation_history",
+}
+
+# Read-only methods, safe to resend when a connection drops mid-call
+IDEMPOTENT_METHODS = SHARD_METHODS - {"add_conversation", "clear_user_memory"}
+
+def shard_for(user_id: str, shard_count: int) -> int:
+    """
+    Map a user to a shard with jump consistent hashing
+
+    Stable across processes (unlike hash()) and moves only ~1/n of users
+    when the shard count changes.
+    """
+    key = int.from_bytes(hashlib.blake2b(user_id.encode("utf-8"), digest_size=8).digest(), "big")
+    bucket, jump = -1, 0
+    while jump < shard_count:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+def shard_address(index: int, host: str = None, base_port: int = None) -> Tuple[str, int]:
+    return (host or config.MEMORY_SHARD_HOST, (base_port or config.MEMORY_SHARD_BASE_PORT) + index)
+
+def check_shard_security(host: str, authkey: str):
+    """
+    Refuse shard settings that would let others reach a shard
+
+    Shards unpickle whatever an authenticated client sends, so the authkey must
+    be a real secret, and listening beyond loopback needs MEMORY_SHARD_ALLOW_REMOTE.
+    """
+    if not authkey:
+        raise ValueError("MEMORY_SHARD_AUTHKEY must be set to a secret to use memory shards")
+    if config.MEMORY_SHARD_ALLOW_REMOTE or host == "localhost":
+        return
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError(
+            f"MEMORY_SHARD_HOST {host!r} is not a loopback address; set MEMORY_SHARD_ALLOW_REMOTE=true to allow it"
+        )
+
+class ShardedMemoryService:
+    """
+    Drop-in MemoryService that forwards each call to the shard owning the user
+
+    Every web worker holds one persistent connection per shard, so all workers
+    see the same memory for a user regardless of which one serves the request.
+    """
+    def __init__(
+        self,
+        shard_count: int,
+        host: str = None,
+        base_port: int = None,
+        authkey: str = None,
+        connect_timeout: float = 10.0
+    ):
+        self.shard_count = shard_count
+        self.addresses = [shard_address(index, host, base_port) for index in range(shard_count)]
+        authkey = authkey or config.MEMORY_SHARD_AUTHKEY
+        check_shard_security(self.addresses[0][0], authkey)
+        self.authkey = authkey.encode()
+        self.connect_timeout = connect_timeout
+        self.wal = None  # Durability is handled inside each shard
+        self._connections: List[Optional[Any]] = [None] * shard_count
+        self._locks = [threading.Lock() for _ in range(shard_count)]
+
+    def _connect(self, index: int):
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return Client(self.addresses[index], authkey=self.authkey)
+            except ConnectionRefusedError:
+                # Shards may still be starting up
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+
+    def _connection(self, index: int):
+        """The shard's connection, replaced first if the shard has closed it (e.g. after a restart)"""
+        conn = self._connections[index]
+        if conn is not None:
+            try:
+                # Nothing is in flight between calls, so anything readable means EOF
+                stale = conn.poll()
+            except (EOFError, OSError):
+                stale = True
+            if stale:
+                conn.close()
+                conn = None
+        if conn is None:
+            conn = self._connections[index] = self._connect(index)
+        return conn
+
+    def _call(self, user_id: str, method: str, *args, **kwargs) -> Any:
+        index = shard_for(user_id, self.shard_count)
+        # A write may already have been applied when the connection drops, so only reads are resent
+        attempts = 2 if method in IDEMPOTENT_METHODS else 1
+        with self._locks[index]:
+            for attempt in range(attempts):
+                conn = self._connection(index)
+                try:
+                    conn.send((method, (user_id,) + args, kwargs))
+                    status, result = conn.recv()
+                    break
+                except (EOFError, OSError):
+                    self._connections[index] = None
+                    if attempt == attempts - 1:
+                        raise
+        if status == "error":
+            raise RuntimeError(f"Memory shard {index}: {result}")
+        return result
+
+    def get_user_memory(self, user_id: str) -> UserMemory:
+        return self._call(user_id, "get_user_memory")
+
+    def get_memory_context(self, user_id: str) -> str:
+        return self._call(user_id, "get_memory_context")
+
+    def add_conversation(
+        self,
+        user_id: str,
+        age: str,
+        user_message: str,
+        ai_response: str,
+        message_type: str = "text",
+        transcribed_text: str = ""
+    ) -> bool:
+        return self._call(user_id, "add_conversation", age, user_message, ai_response, message_type, transcribed_text)
+
+    def clear_user_memory(self, user_id: str) -> bool:
+        return self._call(user_id, "clear_user_memory")
+
+    def get_memory_stats(self, user_id: str) -> Dict:
+        return self._call(user_id, "get_memory_stats")
+
+    def get_memory_etag(self, user_id: str) -> str:
+        return self._call(user_id, "get_memory_etag")
+
+    def iter_conversations(
+        self, user_id: str, before: Optional[datetime] = None, ties_seen: Optional[int] = None
+    ) -> Iterator[ConversationEntry]:
+        return iter(self._call(user_id, "iter_conversations", before, ties_seen))
+
+    def get_conversation_page(
+        self, user_id: str, limit: int = 50, before: Optional[datetime] = None, ties_seen: Optional[int] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        return self._call(user_id, "get_conversation_page", limit, before, ties_seen)
+
+    def get_conversation_history(
+        self, user_id: str, limit: int = 50, before: Optional[datetime] = None, ties_seen: Optional[int] = None
+    ) -> List[Dict]:
+        return self._call(user_id, "get_conversation_history", limit, before, ties_seen)
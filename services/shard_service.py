@@ -0,0 +1,157 @@
+from typing import List, Tuple
+from multiprocessing.connection import Listener
+from services.memory_service import MemoryService
+from services.shard_client import SHARD_METHODS, check_shard_security, shard_address
+from config import config
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def shard_path(path: str, index: int) -> str:
+    """Per-shard variant of a durability path, keeping the extension (and compression) intact"""
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, f"shard{index}-{filename}")
+
+class ShardServer:
+    """
+    Owns the memory of every user hashed to one shard
+
+    Connections are read by one thread each, but every request is executed by
+    the single owner thread, so the MemoryService needs no locking.
+    """
+    def __init__(self, index: int, address: Tuple[str, int], authkey: bytes, memory_service: MemoryService, wal_service=None):
+        self.index = index
+        self.address = address
+        self.authkey = authkey
+        self.memory_service = memory_service
+        self.wal_service = wal_service
+        self.requests: "queue.Queue" = queue.Queue()
+
+    def serve_forever(self, tick: float = 1.0):
+        listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._accept_loop, args=(listener,), daemon=True).start()
+        logger.info(f"Memory shard {self.index} listening on {self.address[0]}:{self.address[1]}")
+
+        next_maintenance = time.monotonic() + tick
+        while True:
+            # Maintenance runs on a timer, so steady traffic can't postpone compaction
+            if time.monotonic() >= next_maintenance:
+                self._maintenance()
+                next_maintenance = time.monotonic() + tick
+            try:
+                conn, (method, args, kwargs) = self.requests.get(timeout=max(0.0, next_maintenance - time.monotonic()))
+            except queue.Empty:
+                continue
+            try:
+                if method not in SHARD_METHODS:
+                    raise ValueError(f"Unknown shard method: {method}")
+                result = getattr(self.memory_service, method)(*args, **kwargs)
+                if inspect.isgenerator(result):
+                    result = list(result)
+                reply = ("ok", result)
+            except Exception as e:
+                logger.error(f"Shard {self.index} failed to run {method}: {str(e)}")
+                reply = ("error", str(e))
+            try:
+                conn.send(reply)
+            except (OSError, EOFError):
+                pass
+
+    def _accept_loop(self, listener: Listener):
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                logger.warning(f"Shard {self.index} rejected a connection: {str(e)}")
+                continue
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _read_loop(self, conn):
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                conn.close()
+                return
+            self.requests.put((conn, message))
+
+    def _maintenance(self):
+        """Periodic fsync and compaction for shards running with a write-ahead log"""
+        if self.wal_service is None:
+            return
+        self.wal_service.wal.maybe_sync()
+        if self.wal_service.compaction_due():
+            asyncio.run(self.wal_service.compact())
+
+def run_shard(index: int, host: str = None, base_port: int = None):
+    """Process entry point for one memory shard; durability files get a per-shard name"""
+    from services.snapshot_service import SnapshotService
+    from services.wal_service import WalService
+
+    logging.basicConfig(level=logging.INFO)
+    # Turn SIGTERM into SystemExit so the finally block below persists memory
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    memory_service = MemoryService()
+    snapshot_service = SnapshotService(memory_service)
+    wal_service = None
+    snapshot_path = shard_path(config.MEMORY_SNAPSHOT_PATH, index) if config.MEMORY_SNAPSHOT_PATH else ""
+
+    if config.MEMORY_WAL_PATH:
+        wal_path = shard_path(config.MEMORY_WAL_PATH, index)
+        wal_service = WalService(
+            memory_service,
+            snapshot_service,
+            wal_path=wal_path,
+            snapshot_path=snapshot_path or f"{wal_path}.snapshot.ndjson",
+            fsync_every=config.MEMORY_WAL_FSYNC_EVERY,
+            fsync_interval=config.MEMORY_WAL_FSYNC_INTERVAL,
+            compact_records=config.MEMORY_WAL_COMPACT_RECORDS,
+            compact_interval=config.MEMORY_WAL_COMPACT_INTERVAL
+        )
+        if not wal_service.claim():
+            raise RuntimeError(f"Memory log {wal_path} is locked by another process; is shard {index} already running?")
+        wal_service.recover()
+    elif config.MEMORY_RESTORE_ON_STARTUP and snapshot_path and os.path.exists(snapshot_path):
+        snapshot_service.import_snapshot(snapshot_path, config.MEMORY_IMPORT_CHUNK_SIZE)
+
+    address = shard_address(index, host, base_port)
+    check_shard_security(address[0], config.MEMORY_SHARD_AUTHKEY)
+    server = ShardServer(index, address, config.MEMORY_SHARD_AUTHKEY.encode(), memory_service, wal_service)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if wal_service is not None:
+            asyncio.run(wal_service.close())
+        elif config.MEMORY_SNAPSHOT_ON_SHUTDOWN and snapshot_path:
+            snapshot_service.export_snapshot(snapshot_path)
+
+def start_shards(shard_count: int, host: str = None, base_port: int = None) -> List[multiprocessing.Process]:
+    """Start one process per shard"""
+    processes = []
+    for index in range(shard_count):
+        process = multiprocessing.Process(
+            target=run_shard, args=(index, host, base_port), name=f"memory-shard-{index}", daemon=False
+        )
+        process.start()
+        processes.append(process)
+    return processes
+
+def stop_shards(processes: List[multiprocessing.Process], timeout: float = 10.0):
+    """Ask shards to persist and exit, then wait for them"""
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout)
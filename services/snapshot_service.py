@@ -0,0 +1,290 @@
+from typing import IO, BinaryIO, Dict, Iterable, Iterator, List, Optional
+from datetime import datetime
+from models.memory_models import UserMemory, ConversationEntry
+from services.memory_service import memory_service, MemoryService
+from utils.serialization import conversation_to_dict, dumps, loads
+import gzip
+import io
+import logging
+import os
+import zlib
+
+try:
+    import zstandard  # Optional - enables .zst snapshots
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_COMPRESSIONS = ("gzip", "zstd")
+
+def compression_for_path(path: str) -> Optional[str]:
+    """Pick the snapshot compression from a file extension"""
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith((".zst", ".zstd")):
+        return "zstd"
+    return None
+
+def check_compression(compression: Optional[str]):
+    if compression is not None and compression not in SUPPORTED_COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}. Supported: {', '.join(SUPPORTED_COMPRESSIONS)}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+
+def claim_path_lock(path: str) -> Optional[IO]:
+    """
+    Take an exclusive, non-blocking lock on `<path>.lock`
+
+    Returns the open lock file, which holds the lock until it is closed or the
+    process exits, or None when another process already holds it.
+    """
+    lock_file = open(f"{path}.lock", "a")
+    try:
+        import fcntl
+    except ImportError:
+        return lock_file  # No advisory locks on this platform
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def conversation_from_dict(conv: Dict) -> ConversationEntry:
+    """Rebuild a conversation entry written by conversation_to_dict, without validation"""
+    return ConversationEntry.model_construct(
+        timestamp=datetime.fromisoformat(conv["timestamp"]),
+        user_message=conv["user_message"],
+        age=conv["age"],
+        ai_response=conv["ai_response"],
+        message_type=conv["message_type"],
+        transcribed_text=conv["transcribed_text"]
+    )
+
+def _restore_conversation_order(memory: UserMemory):
+    """
+    Make (archived + recent) chronological again if a snapshot was edited by hand
+
+    Pagination bisects these lists by timestamp, so they must stay ordered; the
+    recent/archived split keeps its sizes.
+    """
+    conversations = memory.archived_conversations + memory.recent_conversations
+    if all(a.timestamp <= b.timestamp for a, b in zip(conversations, conversations[1:])):
+        return
+    conversations.sort(key=lambda conv: conv.timestamp)
+    split = len(memory.archived_conversations)
+    memory.archived_conversations = conversations[:split]
+    memory.recent_conversations = conversations[split:]
+    logger.warning(f"Re-sorted out-of-order conversations for imported user: {memory.user_id}")
+
+def _open_reader(snapshot_file: BinaryIO, compression: Optional[str]) -> BinaryIO:
+    """Wrap a binary file in a line-iterable decompressing reader"""
+    check_compression(compression)
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=snapshot_file, mode="rb")
+    if compression == "zstd":
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(snapshot_file))
+    return snapshot_file
+
+class SnapshotService:
+    """
+    Streaming NDJSON export/import of all user memories
+
+    Each line holds one user's complete memory, so snapshots can be written and
+    loaded incrementally without materializing the whole file.
+    """
+    def __init__(self, memory_service: MemoryService):
+        self.memory_service = memory_service
+        self._snapshot_lock = None
+
+    @staticmethod
+    def memory_to_record(memory: UserMemory) -> Dict:
+        return {
+            "user_id": memory.user_id,
+            "conversation_count": memory.conversation_count,
+            "last_updated": memory.last_updated,
+            "recent_conversations": [conversation_to_dict(conv) for conv in memory.recent_conversations],
+            "archived_conversations": [conversation_to_dict(conv) for conv in memory.archived_conversations]
+        }
+
+    @staticmethod
+    def record_to_memory(record: Dict, validate: bool = True) -> UserMemory:
+        """
+        Rebuild a UserMemory from an exported record
+
+        validate=False skips pydantic validation for trusted snapshots written by this service.
+        """
+        if validate:
+            return UserMemory.model_validate(record)
+
+        return UserMemory.model_construct(
+            user_id=record["user_id"],
+            recent_conversations=[conversation_from_dict(conv) for conv in record["recent_conversations"]],
+            archived_conversations=[conversation_from_dict(conv) for conv in record["archived_conversations"]],
+            conversation_count=record["conversation_count"],
+            last_updated=datetime.fromisoformat(record["last_updated"])
+        )
+
+    def freeze_memories(self) -> List[UserMemory]:
+        """
+        Point-in-time copy of all user memories, cheap enough to take on the event loop
+
+        Conversation entries are never modified after creation, so copying the
+        lists (not the entries) is enough to isolate the copy from later updates.
+        """
+        return [
+            UserMemory.model_construct(
+                user_id=memory.user_id,
+                recent_conversations=list(memory.recent_conversations),
+                archived_conversations=list(memory.archived_conversations),
+                conversation_count=memory.conversation_count,
+                last_updated=memory.last_updated
+            )
+            for memory in list(self.memory_service.user_memories.values())
+        ]
+
+    def iter_export(
+        self,
+        compression: Optional[str] = None,
+        batch_size: int = 500,
+        memories: Optional[Iterable[UserMemory]] = None,
+        meta: Optional[Dict] = None
+    ) -> Iterator[bytes]:
+        """
+        Yield the NDJSON snapshot of all users in chunks, compressed on the fly if requested
+
+        - **memories**: Export these instead of the live state (e.g. from freeze_memories)
+        - **meta**: Written as a leading {"_meta": ...} line, skipped on import
+        """
+        check_compression(compression)
+        if compression == "gzip":
+            compressor = zlib.compressobj(wbits=31)  # gzip container
+        elif compression == "zstd":
+            compressor = zstandard.ZstdCompressor().compressobj()
+        else:
+            compressor = None
+
+        batch = [dumps({"_meta": meta})] if meta is not None else []
+        if memories is None:
+            # Copy the values so users created mid-export don't break iteration
+            memories = list(self.memory_service.user_memories.values())
+        for memory in memories:
+            batch.append(dumps(self.memory_to_record(memory)))
+            if len(batch) >= batch_size:
+                chunk = b"\n".join(batch) + b"\n"
+                batch = []
+                if compressor is None:
+                    yield chunk
+                else:
+                    compressed = compressor.compress(chunk)
+                    if compressed:
+                        yield compressed
+
+        tail = b"\n".join(batch) + b"\n" if batch else b""
+        if compressor is None:
+            if tail:
+                yield tail
+        else:
+            yield compressor.compress(tail) + compressor.flush()
+
+    def export_snapshot(
+        self,
+        path: str,
+        memories: Optional[List[UserMemory]] = None,
+        meta: Optional[Dict] = None
+    ) -> int:
+        """
+        Write all user memories to path, compressed according to its extension
+
+        The snapshot is written to a temporary file and renamed into place, so a
+        crash mid-export never leaves a truncated snapshot behind. The temporary
+        name is per process so concurrent writers never interleave in one file.
+        """
+        if memories is None:
+            memories = list(self.memory_service.user_memories.values())
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as snapshot_file:
+            for chunk in self.iter_export(compression_for_path(path), memories=memories, meta=meta):
+                snapshot_file.write(chunk)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(tmp_path, path)
+        user_count = len(memories)
+        logger.info(f"Exported memory snapshot for {user_count} users to {path}")
+        return user_count
+
+    def claim_snapshot_path(self, path: str) -> bool:
+        """
+        Take an exclusive, non-blocking lock on `<path>.lock` for the life of this process
+
+        Returns False when another process (e.g. another uvicorn worker) already
+        holds it; only the holder should write snapshots to path.
+        """
+        self._snapshot_lock = claim_path_lock(path)
+        return self._snapshot_lock is not None
+
+    def import_file(
+        self,
+        snapshot_file: BinaryIO,
+        compression: Optional[str] = None,
+        validate: bool = True,
+        chunk_size: int = 1000
+    ) -> int:
+        """
+        Load users from an NDJSON snapshot stream, chunk_size records at a time
+
+        The import is all-or-nothing: every record is parsed and validated into a
+        staging dict first, and live memory is only updated once the whole stream
+        has been read. Malformed input raises ValueError and changes nothing.
+        Imported users replace any in-memory memory with the same user_id.
+        Returns the number of users imported.
+        """
+        reader = _open_reader(snapshot_file, compression)
+        staged: Dict[str, UserMemory] = {}
+        for chunk in self._iter_chunks(reader, chunk_size):
+            for record in chunk:
+                if not isinstance(record, dict):
+                    raise ValueError(f"Snapshot records must be JSON objects, got {type(record).__name__}")
+                if "_meta" in record:
+                    continue
+                memory = self.record_to_memory(record, validate=validate)
+                _restore_conversation_order(memory)
+                staged[memory.user_id] = memory
+        self.memory_service.user_memories.update(staged)
+        return len(staged)
+
+    def import_snapshot(self, path: str, chunk_size: int = 1000) -> int:
+        """Restore a snapshot previously written by export_snapshot"""
+        with open(path, "rb") as snapshot_file:
+            imported = self.import_file(
+                snapshot_file, compression_for_path(path), validate=False, chunk_size=chunk_size
+            )
+        logger.info(f"Restored memory snapshot for {imported} users from {path}")
+        return imported
+
+    @staticmethod
+    def read_meta(path: str) -> Dict:
+        """Return the {"_meta": ...} header of a snapshot file, or {} if it has none"""
+        with open(path, "rb") as snapshot_file:
+            first_line = _open_reader(snapshot_file, compression_for_path(path)).readline().strip()
+        if not first_line:
+            return {}
+        return loads(first_line).get("_meta", {})
+
+    @staticmethod
+    def _iter_chunks(lines: Iterable[bytes], chunk_size: int) -> Iterator[List[Dict]]:
+        chunk = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            chunk.append(loads(line))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+# Initialize global snapshot service
+snapshot_service = SnapshotService(memory_service)
@@ -0,0 +1,249 @@
+from typing import Dict, Iterator, List, Optional
+from services.memory_service import memory_service, MemoryService
+from services.snapshot_service import snapshot_service, SnapshotService, claim_path_lock, conversation_from_dict
+from config import config
+from utils.serialization import dumps, loads
+import asyncio
+import glob
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+class WriteAheadLog:
+    """
+    Append-only NDJSON log of memory mutations
+
+    Every record gets a monotonically increasing "seq". Records are written to
+    the OS immediately; fsync is batched and happens once `fsync_every` records
+    or `fsync_interval` seconds have accumulated (0 disables that trigger, so
+    fsync_every=1 syncs every write and 0/0 leaves syncing to the OS).
+    """
+    def __init__(self, path: str, seq: int = 0, fsync_every: int = 100, fsync_interval: float = 1.0):
+        self.path = path
+        self.seq = seq
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.records_since_rotate = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = open(path, "ab")
+
+    def append(self, record: Dict) -> int:
+        self.seq += 1
+        record["seq"] = self.seq
+        self._file.write(dumps(record) + b"\n")
+        self._file.flush()
+        self._unsynced += 1
+        self.records_since_rotate += 1
+        self.maybe_sync()
+        return self.seq
+
+    def maybe_sync(self):
+        """fsync if either batching threshold has been reached"""
+        if not self._unsynced:
+            return
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            self.sync()
+        elif self.fsync_interval and time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def rotate(self) -> Optional[str]:
+        """
+        Seal the current segment as `<path>.<last seq>` and start a new one
+
+        An empty active segment is left alone (returns None), and an existing
+        sealed segment is never overwritten.
+        """
+        if self._file.tell() == 0:
+            return None
+        self.sync()
+        segment_path = f"{self.path}.{self.seq}"
+        if os.path.exists(segment_path):
+            raise FileExistsError(f"Log segment {segment_path} already exists")
+        self._file.close()
+        os.replace(self.path, segment_path)
+        self._file = open(self.path, "ab")
+        self.records_since_rotate = 0
+        return segment_path
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    @staticmethod
+    def segment_paths(path: str) -> List[str]:
+        """Sealed segments (oldest first) followed by the active log, if present"""
+        segments = [p for p in glob.glob(f"{glob.escape(path)}.*") if p.rsplit(".", 1)[1].isdigit()]
+        segments.sort(key=lambda p: int(p.rsplit(".", 1)[1]))
+        if os.path.exists(path):
+            segments.append(path)
+        return segments
+
+    @staticmethod
+    def truncate_torn_tail(path: str):
+        """Drop a partially written last record so new appends start on a clean line"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as log_file:
+            data = log_file.read()
+            valid_length = data.rfind(b"\n") + 1
+            if valid_length < len(data):
+                log_file.truncate(valid_length)
+                logger.warning(f"Truncated {len(data) - valid_length} bytes of torn record from {path}")
+
+    @staticmethod
+    def read_records(path: str) -> Iterator[Dict]:
+        """Yield records from a segment, stopping at a torn (partially written) tail"""
+        with open(path, "rb") as log_file:
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    logger.warning(f"Ignoring torn record at end of {path}")
+                    return
+                line = line.strip()
+                if line:
+                    yield loads(line)
+
+class WalService:
+    """
+    Durability for MemoryService: write-ahead log, background compaction and crash recovery
+
+    Compaction folds the log into a snapshot (written by SnapshotService with the
+    covered seq in its header) and deletes the sealed segments it covers. Recovery
+    loads the snapshot and replays only records newer than that seq.
+    """
+    def __init__(
+        self,
+        memory_service: MemoryService,
+        snapshot_service: SnapshotService,
+        wal_path: str,
+        snapshot_path: str,
+        fsync_every: int = 100,
+        fsync_interval: float = 1.0,
+        compact_records: int = 100000,
+        compact_interval: float = 300.0
+    ):
+        self.memory_service = memory_service
+        self.snapshot_service = snapshot_service
+        self.wal_path = wal_path
+        self.snapshot_path = snapshot_path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_records = compact_records
+        self.compact_interval = compact_interval
+        self.wal: Optional[WriteAheadLog] = None
+        self._last_compaction = time.monotonic()
+        self._compaction_lock = asyncio.Lock()
+        self._path_lock = None
+
+    def claim(self) -> bool:
+        """
+        Lock the log for this process before recovering it
+
+        Returns False when another process (e.g. another uvicorn worker) already
+        owns it; two writers would interleave seqs and compact each other's segments.
+        """
+        if self._path_lock is None:
+            self._path_lock = claim_path_lock(self.wal_path)
+        return self._path_lock is not None
+
+    def recover(self) -> int:
+        """Rebuild memory from the last snapshot plus the log, then start logging. Returns records replayed."""
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            snapshot_seq = self.snapshot_service.read_meta(self.snapshot_path).get("wal_seq", 0)
+            self.snapshot_service.import_snapshot(self.snapshot_path, config.MEMORY_IMPORT_CHUNK_SIZE)
+
+        last_seq = snapshot_seq
+        replayed = 0
+        for segment_path in WriteAheadLog.segment_paths(self.wal_path):
+            for record in WriteAheadLog.read_records(segment_path):
+                if record["seq"] <= last_seq:
+                    continue
+                self._replay(record)
+                last_seq = record["seq"]
+                replayed += 1
+
+        WriteAheadLog.truncate_torn_tail(self.wal_path)
+        self.wal = WriteAheadLog(self.wal_path, last_seq, self.fsync_every, self.fsync_interval)
+        self.memory_service.wal = self.wal
+        logger.info(f"Recovered memory from snapshot (seq {snapshot_seq}) and {replayed} log records")
+        return replayed
+
+    def _replay(self, record: Dict):
+        if record["op"] == "add":
+            self.memory_service.apply_conversation(record["user_id"], conversation_from_dict(record["conversation"]))
+        elif record["op"] == "clear":
+            self.memory_service.user_memories.pop(record["user_id"], None)
+
+    async def compact(self):
+        """
+        Fold the log into a fresh snapshot
+
+        The log rotation and the point-in-time copy happen together on the event
+        loop, so the snapshot covers exactly the records up to the sealed seq;
+        encoding and writing then run in a worker thread. A call made while
+        another compaction is running waits for it and then compacts again, so
+        changes made in the meantime (e.g. an import) are always covered.
+        """
+        if self.wal is None:
+            return
+        async with self._compaction_lock:
+            self.wal.rotate()
+            wal_seq = self.wal.seq
+            memories = self.snapshot_service.freeze_memories()
+            await asyncio.to_thread(self._write_snapshot, memories, wal_seq)
+            self._last_compaction = time.monotonic()
+
+    def _write_snapshot(self, memories, wal_seq: int):
+        self.snapshot_service.export_snapshot(self.snapshot_path, memories=memories, meta={"wal_seq": wal_seq})
+        for segment_path in WriteAheadLog.segment_paths(self.wal_path):
+            if segment_path != self.wal_path and int(segment_path.rsplit(".", 1)[1]) <= wal_seq:
+                os.remove(segment_path)
+        logger.info(f"Compacted memory log into snapshot at seq {wal_seq}")
+
+    def compaction_due(self) -> bool:
+        if self.wal is None or not self.wal.records_since_rotate:
+            return False
+        if self.compact_records and self.wal.records_since_rotate >= self.compact_records:
+            return True
+        return bool(self.compact_interval) and time.monotonic() - self._last_compaction >= self.compact_interval
+
+    async def run_background(self):
+        """Periodically fsync idle batches and compact the log; run as an asyncio task"""
+        tick = min(t for t in (self.fsync_interval, 1.0) if t > 0)
+        while True:
+            await asyncio.sleep(tick)
+            try:
+                self.wal.maybe_sync()
+                if self.compaction_due():
+                    await self.compact()
+            except Exception as e:
+                logger.error(f"Memory log maintenance failed: {str(e)}")
+
+    async def close(self):
+        """Final compaction on shutdown, then close the log"""
+        if self.wal is None:
+            return
+        await self.compact()
+        self.wal.close()
+        self.memory_service.wal = None
+
+# Initialize global WAL service (inactive unless MEMORY_WAL_PATH is set)
+wal_service = WalService(
+    memory_service,
+    snapshot_service,
+    wal_path=config.MEMORY_WAL_PATH,
+    snapshot_path=config.MEMORY_SNAPSHOT_PATH or f"{config.MEMORY_WAL_PATH}.snapshot.ndjson",
+    fsync_every=config.MEMORY_WAL_FSYNC_EVERY,
+    fsync_interval=config.MEMORY_WAL_FSYNC_INTERVAL,
+    compact_records=config.MEMORY_WAL_COMPACT_RECORDS,
+    compact_interval=config.MEMORY_WAL_COMPACT_INTERVAL
+)
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.memory_models import ConversationEntry
+from services.memory_service import MemoryService, decode_cursor, encode_cursor
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+def populate(memory_service: MemoryService, timestamps, user_id: str = "user"):
+    for i, timestamp in enumerate(timestamps):
+        memory_service.apply_conversation(user_id, ConversationEntry(
+            timestamp=timestamp, user_message=f"message {i}", age="15", ai_response="reply"
+        ))
+
+def page_through(memory_service: MemoryService, limit: int, user_id: str = "user"):
+    messages, before, ties_seen = [], None, None
+    while True:
+        page, cursor = memory_service.get_conversation_page(user_id, limit, before, ties_seen)
+        messages.extend(conv["user_message"] for conv in page)
+        if cursor is None:
+            return messages
+        before, ties_seen = decode_cursor(cursor)
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 5, 20])
+def test_pages_cover_every_entry_once_when_timestamps_tie(limit):
+    memory_service = MemoryService()
+    # Groups of three conversations share a timestamp, across the recent/archived split
+    populate(memory_service, [BASE_TIME + timedelta(seconds=i // 3) for i in range(14)])
+
+    newest_first = [conv.user_message for conv in memory_service.iter_conversations("user")]
+    assert page_through(memory_service, limit) == newest_first
+
+def test_all_entries_sharing_one_timestamp():
+    memory_service = MemoryService()
+    populate(memory_service, [BASE_TIME] * 7)
+    assert len(page_through(memory_service, 2)) == 7
+
+def test_history_is_newest_first_with_iso_timestamps():
+    memory_service = MemoryService()
+    populate(memory_service, [BASE_TIME + timedelta(minutes=i) for i in range(4)])
+
+    history = memory_service.get_conversation_history("user", limit=10)
+
+    assert [conv["user_message"] for conv in history] == ["message 3", "message 2", "message 1", "message 0"]
+    assert history[0]["timestamp"] == (BASE_TIME + timedelta(minutes=3)).isoformat()
+
+def test_last_page_has_no_cursor():
+    memory_service = MemoryService()
+    populate(memory_service, [BASE_TIME + timedelta(minutes=i) for i in range(3)])
+    _, cursor = memory_service.get_conversation_page("user", 3)
+    assert cursor is None
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(BASE_TIME, 2)) == (BASE_TIME, 2)
+
+def test_bare_timestamp_cursor_means_strictly_older():
+    memory_service = MemoryService()
+    populate(memory_service, [BASE_TIME, BASE_TIME, BASE_TIME + timedelta(minutes=1)])
+
+    before, ties_seen = decode_cursor((BASE_TIME + timedelta(minutes=1)).isoformat())
+    page, _ = memory_service.get_conversation_page("user", 10, before, ties_seen)
+
+    assert ties_seen is None
+    assert [conv["user_message"] for conv in page] == ["message 1", "message 0"]
+
+@pytest.mark.parametrize("cursor", ["not-a-date", "2025-01-01T12:00:00~x", "2025-01-01T12:00:00~-1"])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_etag_changes_on_add_and_clear():
+    memory_service = MemoryService()
+    empty = memory_service.get_memory_etag("user")
+
+    memory_service.add_conversation("user", "15", "hello", "hi there")
+    added = memory_service.get_memory_etag("user")
+    assert added != empty
+    assert memory_service.get_memory_etag("user") == added  # Stable while nothing changes
+
+    memory_service.clear_user_memory("user")
+    assert memory_service.get_memory_etag("user") != added
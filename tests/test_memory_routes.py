@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("httpx")
+testclient = pytest.importorskip("fastapi.testclient")
+
+from fastapi import FastAPI
+
+from routes import memory_routes
+from services.memory_service import memory_service
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(memory_routes.router)
+    memory_service.clear_user_memory("etag-user")
+    memory_service.add_conversation("etag-user", "15", "hello", "hi there")
+    yield testclient.TestClient(app)
+    memory_service.clear_user_memory("etag-user")
+
+@pytest.mark.parametrize("path", ["/api/memory/etag-user", "/api/conversations/etag-user"])
+def test_if_none_match_returns_304_until_memory_changes(client, path):
+    first = client.get(path)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    cached = client.get(path, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    memory_service.add_conversation("etag-user", "15", "again", "still here")
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/conversations/etag-user", params={"cursor": "yesterday"}).status_code == 400
+
+def test_export_import_hidden_by_default(client):
+    assert client.get("/api/memory-export").status_code == 404
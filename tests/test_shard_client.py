@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from services.shard_client import ShardedMemoryService
+
+class FakeConnection:
+    """Stands in for a multiprocessing connection to a shard"""
+    def __init__(self, fail_recv: bool = False, closed_by_shard: bool = False):
+        self.fail_recv = fail_recv
+        self.closed_by_shard = closed_by_shard
+        self.sent = []
+        self.closed = False
+
+    def poll(self):
+        return self.closed_by_shard
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def recv(self):
+        if self.fail_recv:
+            raise EOFError
+        return "ok", self.sent[-1][0]
+
+    def close(self):
+        self.closed = True
+
+def make_client(connections):
+    client = ShardedMemoryService(1, host="127.0.0.1", base_port=1, authkey="test-secret")
+    pending = iter(connections)
+    client._connect = lambda index: next(pending)
+    return client
+
+def test_reads_are_resent_after_a_dropped_connection():
+    dropped, fresh = FakeConnection(fail_recv=True), FakeConnection()
+    client = make_client([dropped, fresh])
+
+    assert client.get_memory_stats("alice") == "get_memory_stats"
+    assert len(dropped.sent) == len(fresh.sent) == 1
+
+def test_writes_are_not_resent_after_a_dropped_connection():
+    dropped, fresh = FakeConnection(fail_recv=True), FakeConnection()
+    client = make_client([dropped, fresh])
+
+    with pytest.raises(EOFError):
+        client.add_conversation("alice", "15", "hello", "reply")
+    assert len(dropped.sent) == 1
+    assert not fresh.sent
+
+    # The next call reconnects
+    assert client.add_conversation("alice", "15", "hello again", "reply") == "add_conversation"
+    assert len(fresh.sent) == 1
+
+def test_connection_closed_by_shard_is_replaced_before_sending():
+    stale, fresh = FakeConnection(), FakeConnection()
+    client = make_client([stale, fresh])
+    client.clear_user_memory("alice")
+
+    stale.closed_by_shard = True
+    assert client.add_conversation("alice", "15", "hello", "reply") == "add_conversation"
+    assert stale.closed
+    assert len(stale.sent) == 1
+    assert len(fresh.sent) == 1
+
+def import_in_sharded_mode(modules: str) -> subprocess.CompletedProcess:
+    """Import modules in a fresh interpreter configured for MEMORY_SHARDS (nothing connects at import)"""
+    env = dict(
+        os.environ,
+        MEMORY_SHARDS="2",
+        MEMORY_SHARD_AUTHKEY="test-secret",
+        MEMORY_SHARD_HOST="127.0.0.1",
+        PYTHONPATH=os.pathsep.join(sys.path)
+    )
+    code = f"import {modules}; import services.memory_service as m; print(type(m.memory_service).__name__)"
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+@pytest.mark.parametrize("modules", [
+    # run.py imports shard_service before anything else has loaded memory_service
+    "services.shard_service, services.memory_service",
+    "services.memory_service, services.shard_service",
+])
+def test_sharded_mode_imports(modules):
+    probe = import_in_sharded_mode(modules)
+    assert probe.returncode == 0, probe.stderr
+    assert probe.stdout.strip() == "ShardedMemoryService"
+
+def test_sharded_mode_imports_main():
+    pytest.importorskip("fastapi.middleware.cors")
+    probe = import_in_sharded_mode("services.shard_service, main")
+    assert probe.returncode == 0, probe.stderr
+    assert probe.stdout.strip() == "ShardedMemoryService"
@@ -0,0 +1,104 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.memory_models import ConversationEntry
+from services.memory_service import MemoryService
+from services.snapshot_service import SnapshotService
+from utils.serialization import dumps
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+def make_service(users: int = 3, turns: int = 8) -> SnapshotService:
+    memory_service = MemoryService()
+    for user in range(users):
+        for turn in range(turns):
+            memory_service.apply_conversation(f"user-{user}", ConversationEntry(
+                timestamp=BASE_TIME + timedelta(minutes=turn),
+                user_message=f"message {turn}",
+                age="15",
+                ai_response="reply",
+                message_type="voice" if turn % 2 else "text",
+                transcribed_text=f"message {turn}" if turn % 2 else ""
+            ))
+    return SnapshotService(memory_service)
+
+def export_bytes(service: SnapshotService, compression=None, meta=None) -> bytes:
+    return b"".join(service.iter_export(compression, batch_size=2, meta=meta))
+
+def history(service: SnapshotService, user_id: str):
+    return service.memory_service.get_conversation_history(user_id, limit=100)
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_round_trip(compression):
+    source = make_service()
+    data = export_bytes(source, compression, meta={"wal_seq": 7})
+
+    target = SnapshotService(MemoryService())
+    imported = target.import_file(io.BytesIO(data), compression)
+
+    assert imported == 3
+    for user in range(3):
+        assert history(target, f"user-{user}") == history(source, f"user-{user}")
+        assert (target.memory_service.get_memory_stats(f"user-{user}")
+                == source.memory_service.get_memory_stats(f"user-{user}"))
+
+def test_export_file_round_trip_with_meta(tmp_path):
+    source = make_service()
+    path = str(tmp_path / "memories.ndjson.gz")
+    source.export_snapshot(path, meta={"wal_seq": 42})
+
+    target = SnapshotService(MemoryService())
+    assert target.read_meta(path) == {"wal_seq": 42}
+    assert target.import_snapshot(path) == 3
+    assert not [name for name in tmp_path.iterdir() if name.suffix == ".tmp"]
+
+def test_bad_record_imports_nothing():
+    target = make_service(users=1)
+    before = history(target, "user-0")
+    lines = export_bytes(make_service(users=4)).splitlines()
+    lines[3] = b'{"user_id": "user-3", "recent_conversations": "oops"}'
+
+    with pytest.raises(ValueError):
+        target.import_file(io.BytesIO(b"\n".join(lines) + b"\n"), chunk_size=1)
+
+    # Earlier chunks were parsed but must not have replaced live users
+    assert history(target, "user-0") == before
+    assert set(target.memory_service.user_memories) == {"user-0"}
+
+@pytest.mark.parametrize("line", [b"[1]", b'"x"', b"3", b"null"])
+def test_non_object_lines_are_rejected(line):
+    target = SnapshotService(MemoryService())
+    with pytest.raises(ValueError):
+        target.import_file(io.BytesIO(line + b"\n"))
+
+def test_invalid_json_is_rejected():
+    target = SnapshotService(MemoryService())
+    with pytest.raises(ValueError):
+        target.import_file(io.BytesIO(b'{"user_id": \n'))
+
+def test_out_of_order_conversations_are_sorted_on_import():
+    record = SnapshotService.memory_to_record(make_service(users=1).memory_service.get_user_memory("user-0"))
+    record["recent_conversations"].reverse()
+    record["archived_conversations"], record["recent_conversations"][:1] = (
+        record["recent_conversations"][:1], record["archived_conversations"][:1]
+    )
+
+    target = SnapshotService(MemoryService())
+    target.import_file(io.BytesIO(dumps(record) + b"\n"))
+
+    memory = target.memory_service.get_user_memory("user-0")
+    timestamps = [conv.timestamp for conv in memory.archived_conversations + memory.recent_conversations]
+    assert timestamps == sorted(timestamps)
+    assert len(memory.archived_conversations) == len(record["archived_conversations"])
+
+def test_freeze_memories_is_isolated_from_later_updates():
+    service = make_service(users=1)
+    frozen = service.freeze_memories()
+    service.memory_service.add_conversation("user-0", "15", "after freeze", "reply")
+    service.memory_service.add_conversation("user-new", "15", "hello", "reply")
+
+    data = b"".join(service.iter_export(memories=frozen))
+    assert b"after freeze" not in data
+    assert b"user-new" not in data
@@ -0,0 +1,111 @@
+import asyncio
+import os
+
+import pytest
+
+from services.memory_service import MemoryService
+from services.snapshot_service import SnapshotService
+from services.wal_service import WalService, WriteAheadLog
+
+def make_wal_service(directory, **kwargs) -> WalService:
+    memory_service = MemoryService()
+    wal_path = os.path.join(str(directory), "memory.wal")
+    return WalService(
+        memory_service,
+        SnapshotService(memory_service),
+        wal_path=wal_path,
+        snapshot_path=f"{wal_path}.snapshot.ndjson",
+        fsync_every=1,
+        fsync_interval=0,
+        **kwargs
+    )
+
+def restart(service: WalService) -> WalService:
+    """Simulate a crash: drop the process state without a final compaction"""
+    service.wal.close()
+    recovered = make_wal_service(os.path.dirname(service.wal_path))
+    recovered.recover()
+    return recovered
+
+def messages(service: WalService, user_id: str):
+    """User messages, oldest first"""
+    history = service.memory_service.get_conversation_history(user_id, limit=100)
+    return [conv["user_message"] for conv in reversed(history)]
+
+def test_recover_replays_adds_and_clears(tmp_path):
+    service = make_wal_service(tmp_path)
+    assert service.recover() == 0
+    for i in range(3):
+        service.memory_service.add_conversation("alice", "15", f"alice {i}", "reply")
+    service.memory_service.add_conversation("bob", "15", "bob 0", "reply")
+    service.memory_service.clear_user_memory("bob")
+
+    recovered = restart(service)
+
+    assert messages(recovered, "alice") == ["alice 0", "alice 1", "alice 2"]
+    assert "bob" not in recovered.memory_service.user_memories
+    assert recovered.wal.seq == 5
+
+def test_torn_tail_is_truncated_before_new_appends(tmp_path):
+    service = make_wal_service(tmp_path)
+    service.recover()
+    service.memory_service.add_conversation("alice", "15", "kept", "reply")
+    service.wal.close()
+    with open(service.wal_path, "ab") as log_file:
+        log_file.write(b'{"op": "add", "user_id": "alice", "conv')
+
+    recovered = make_wal_service(tmp_path)
+    assert recovered.recover() == 1
+    recovered.memory_service.add_conversation("alice", "15", "after crash", "reply")
+
+    again = restart(recovered)
+    assert messages(again, "alice") == ["kept", "after crash"]
+    assert [record["seq"] for record in WriteAheadLog.read_records(again.wal_path)] == [1, 2]
+
+def test_compaction_folds_log_into_snapshot(tmp_path):
+    service = make_wal_service(tmp_path)
+    service.recover()
+    for i in range(4):
+        service.memory_service.add_conversation("alice", "15", f"before {i}", "reply")
+    asyncio.run(service.compact())
+    service.memory_service.add_conversation("alice", "15", "after", "reply")
+
+    # Sealed segments are gone; only the active log with the newer record remains
+    assert WriteAheadLog.segment_paths(service.wal_path) == [service.wal_path]
+    assert service.snapshot_service.read_meta(service.snapshot_path) == {"wal_seq": 4}
+
+    recovered = restart(service)
+    assert messages(recovered, "alice") == ["before 0", "before 1", "before 2", "before 3", "after"]
+    assert recovered.wal.seq == 5
+
+def test_failed_compaction_keeps_segments(tmp_path, monkeypatch):
+    service = make_wal_service(tmp_path)
+    service.recover()
+    service.memory_service.add_conversation("alice", "15", "first", "reply")
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(service.snapshot_service, "export_snapshot", fail)
+    with pytest.raises(OSError):
+        asyncio.run(service.compact())
+    monkeypatch.undo()
+
+    service.memory_service.add_conversation("alice", "15", "second", "reply")
+    assert len(WriteAheadLog.segment_paths(service.wal_path)) == 2
+
+    recovered = restart(service)
+    assert messages(recovered, "alice") == ["first", "second"]
+
+    # The retry covers the sealed segment left behind by the failure
+    asyncio.run(recovered.compact())
+    assert WriteAheadLog.segment_paths(recovered.wal_path) == [recovered.wal_path]
+    assert messages(restart(recovered), "alice") == ["first", "second"]
+
+def test_second_process_cannot_claim_the_log(tmp_path):
+    pytest.importorskip("fcntl")
+    owner = make_wal_service(tmp_path)
+    assert owner.claim()
+    assert owner.claim()  # Claiming again in the owning process is a no-op
+
+    # flock locks belong to the open file, so a second WalService stands in for another worker
+    assert not make_wal_service(tmp_path).claim()
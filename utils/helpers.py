@@ -31,4 +31,16 @@ def format_timestamp() -> str:
 
 def clean_text(text: str) -> str:
     """Clean and format text for memory storage"""
-    return text.strip().replace("\n", " ").replace("  ", " ")
\ No newline at end of file
+    return text.strip().replace("\n", " ").replace("  ", " ")
+
+def age_bucket(age: str) -> str:
+    """Map a user's age to the prompt's age group (0-12, 12-18, 18+) or "unknown" if not a number"""
+    try:
+        years = float(str(age).strip())
+    except ValueError:
+        return "unknown"
+    if years < 12:
+        return "0-12"
+    if years < 18:
+        return "12-18"
+    return "18+"
\ No newline at end of file
@@ -0,0 +1,19 @@
+# utils/responses.py
+from typing import Any
+
+from fastapi.responses import Response
+
+from utils.serialization import dumps
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered with dumps() - orjson when installed, stdlib json otherwise
+
+    Return it directly from an endpoint to skip response_model validation.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,56 @@
+# utils/serialization.py
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator
+
+from pydantic import BaseModel
+
+try:
+    import orjson  # Optional - much faster encoding when installed
+except ImportError:
+    orjson = None
+
+def conversation_to_dict(conv: Any, iso_timestamp: bool = False) -> Dict[str, Any]:
+    """
+    Convert a conversation entry to a plain dict for API responses
+
+    Timestamps stay as datetime objects (dumps() encodes them as ISO 8601)
+    unless iso_timestamp is set.
+    """
+    return {
+        "timestamp": conv.timestamp.isoformat() if iso_timestamp else conv.timestamp,
+        "user_message": conv.user_message,
+        "age": getattr(conv, 'age', None),
+        "ai_response": conv.ai_response,
+        "message_type": conv.message_type,
+        "transcribed_text": conv.transcribed_text
+    }
+
+def _default(obj: Any) -> Any:
+    """Encode types the JSON encoders don't handle natively"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    """Pure-stdlib encoder producing the same compact output as orjson"""
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+dumps = _orjson_dumps if orjson is not None else _stdlib_dumps
+loads = orjson.loads if orjson is not None else json.loads
+
+def iter_ndjson(items: Iterable[Any], batch_size: int = 100) -> Iterator[bytes]:
+    """Encode items as NDJSON, batching lines so each yielded chunk holds up to batch_size records"""
+    batch = []
+    for item in items:
+        batch.append(dumps(item))
+        if len(batch) >= batch_size:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
@@ -1,28 +1,32 @@
-from groq import Groq
 from config import config
+from services.groq_client import get_groq_client
 import logging
-import tempfile
 import os
-from typing import Optional
+from typing import BinaryIO, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# transcribe_audio reports failures as messages starting with one of these
+TRANSCRIPTION_ERROR_PREFIXES = ("⚠️", "❌", "🔑", "⏳", "📁")
+
+# transcribe_audio's result for audio that decoded fine but contained no speech
+NO_SPEECH_MESSAGE = "❌ No speech detected in the audio file."
+
 class AudioTranscriptionService:
     def __init__(self):
-        try:
-            self.client = Groq(api_key=config.GROQ_API_KEY)
-            self.model = "whisper-large-v3"  # Groq's Whisper model
-            logger.info("Audio transcription service initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize audio transcription service: {str(e)}")
-            self.client = None
+        self.model = "whisper-large-v3"  # Groq's Whisper model
+    
+    @property
+    def client(self):
+        """Shared Groq client, created on first use (None if it couldn't be created)"""
+        return get_groq_client()
     
-    def transcribe_audio(self, audio_file_content: bytes, filename: str) -> Optional[str]:
+    def transcribe_audio(self, audio_file_content: Union[bytes, BinaryIO], filename: str) -> Optional[str]:
         """
         Transcribe audio file content to text using Groq Whisper API
         
         Args:
-            audio_file_content: Raw audio file bytes
+            audio_file_content: Raw audio file bytes, or a binary file object positioned at the start
             filename: Original filename for format detection
             
         Returns:
@@ -46,43 +50,27 @@ class AudioTranscriptionService:
             return f"❌ Unsupported audio format. Supported formats: {', '.join(supported_formats)}"
         
         try:
-            # Create temporary file for Groq API
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-                temp_file.write(audio_file_content)
-                temp_file_path = temp_file.name
+            # Send the bytes (or already-spooled upload file) straight to the Groq Whisper API
+            transcription = self.client.audio.transcriptions.create(
+                file=(filename, audio_file_content, "audio/mpeg"),
+                model=self.model,
+                prompt="",  # Optional context
+                response_format="text",  # Get plain text
+                language="en",  # Auto-detect if not specified
+                temperature=0.0  # More deterministic
+            )
             
-            try:
-                # Transcribe using Groq Whisper API
-                with open(temp_file_path, "rb") as audio_file:
-                    transcription = self.client.audio.transcriptions.create(
-                        file=(filename, audio_file, "audio/mpeg"),
-                        model=self.model,
-                        prompt="",  # Optional context
-                        response_format="text",  # Get plain text
-                        language="en",  # Auto-detect if not specified
-                        temperature=0.0  # More deterministic
-                    )
-                
-                # Clean up temporary file
-                os.unlink(temp_file_path)
-                
-                if isinstance(transcription, str):
-                    transcript_text = transcription.strip()
-                else:
-                    # Handle if response is an object with text attribute
-                    transcript_text = getattr(transcription, 'text', str(transcription)).strip()
-                
-                if not transcript_text:
-                    return "❌ No speech detected in the audio file."
-                
-                logger.info(f"Successfully transcribed audio: {len(transcript_text)} characters")
-                return transcript_text
-                
-            except Exception as e:
-                # Clean up temporary file in case of error
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
-                raise e
+            if isinstance(transcription, str):
+                transcript_text = transcription.strip()
+            else:
+                # Handle if response is an object with text attribute
+                transcript_text = getattr(transcription, 'text', str(transcription)).strip()
+            
+            if not transcript_text:
+                return NO_SPEECH_MESSAGE
+            
+            logger.info(f"Successfully transcribed audio: {len(transcript_text)} characters")
+            return transcript_text
                 
         except Exception as e:
             logger.error(f"Error transcribing audio: {str(e)}")
@@ -96,19 +84,32 @@ class AudioTranscriptionService:
             else:
                 return f"❌ Transcription failed: {str(e)}"
     
+    def is_transcription_error(self, transcribed_text: Optional[str]) -> bool:
+        """Check whether transcribe_audio returned an error message instead of a transcript"""
+        return not transcribed_text or transcribed_text.startswith(TRANSCRIPTION_ERROR_PREFIXES)
+    
     def validate_audio_file(self, file_content: bytes, filename: str) -> tuple[bool, str]:
         """
         Validate if the uploaded file is a valid audio file
         
+        Returns:
+            (is_valid, error_message)
+        """
+        return self.validate_audio_size(len(file_content), filename)
+    
+    def validate_audio_size(self, file_size: int, filename: str) -> tuple[bool, str]:
+        """
+        Validate an audio file by size and name, without needing its content in memory
+        
         Returns:
             (is_valid, error_message)
         """
         # Check file size (Groq limit is 25MB)
         max_size = 25 * 1024 * 1024  # 25MB in bytes
-        if len(file_content) > max_size:
+        if file_size > max_size:
             return False, "File too large. Maximum size is 25MB."
         
-        if len(file_content) == 0:
+        if file_size == 0:
             return False, "Empty file uploaded."
         
         # Check file extension